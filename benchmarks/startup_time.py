@@ -0,0 +1,96 @@
+# benchmarks/startup_time.py
+#
+# Measures interpreter + import cost of each CLI subcommand with `python -X importtime`.
+# Every command runs for real against a tiny throwaway database, so the lazy imports
+# it triggers are counted.
+#
+#   python benchmarks/startup_time.py [--repeat 5] [--top 3]
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# subcommand -> argv; {tmp} is replaced with the scratch directory
+COMMANDS = {
+    "crawl": ["crawl", "--limit", "0", "--logfile", "{tmp}/crawler.log"],
+    "export": ["export", "--output", "{tmp}/links.json"],
+    "analyze": ["analyze"],
+    "path": ["path", "/wiki/A", "/wiki/B"],
+    "neighborhood": ["neighborhood", "/wiki/A"],
+    "ingest": ["ingest", "--logfile", "{tmp}/crawler.log"],
+    "merge": ["merge", "{tmp}/missing.db", "--logfile", "{tmp}/crawler.log"],
+}
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def seed_db(path):
+    sys.path.insert(0, ROOT)
+    os.environ["WIKI_DB_PATH"] = path
+    import py_crawler.db as db
+
+    db.create_tables()
+    db.insert_links("/wiki/A", ["/wiki/B", "/wiki/C"])
+    db.insert_links("/wiki/B", ["/wiki/C"])
+    db.mark_crawled("/wiki/A")
+    db.mark_crawled("/wiki/B")
+
+
+def parse_importtime(stderr):
+    """Return (total import µs, [(cumulative µs, module)] for top-level imports)."""
+    top_level = []
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            top_level.append((int(match.group(2)), match.group(4)))
+    return sum(us for us, _ in top_level), sorted(top_level, reverse=True)
+
+
+def run_once(argv, env):
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "py_crawler", *argv],
+        cwd=env["BENCH_TMP"], env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    total_us, modules = parse_importtime(proc.stderr)
+    return wall, total_us, modules, proc.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-subcommand startup and import time")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command; the fastest is reported")
+    parser.add_argument("--top", type=int, default=3, help="Heaviest top-level imports to list")
+    parser.add_argument("commands", nargs="*", help=f"Subset to run: {', '.join(COMMANDS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.commands if name not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_db(db_path)
+        env = dict(os.environ, WIKI_DB_PATH=db_path, BENCH_TMP=tmp, PYTHONPATH=ROOT)
+
+        print(f"{'command':<14}{'wall ms':>10}{'import ms':>11}  heaviest imports")
+        for name in args.commands or COMMANDS:
+            argv = [arg.format(tmp=tmp) for arg in COMMANDS[name]]
+            best = None
+            for _ in range(args.repeat):
+                result = run_once(argv, env)
+                if best is None or result[0] < best[0]:
+                    best = result
+            wall, total_us, modules, code = best
+            heaviest = ", ".join(f"{mod} {us / 1000:.1f}" for us, mod in modules[:args.top])
+            status = "" if code == 0 else f"  (exit {code})"
+            print(f"{name:<14}{wall * 1000:>10.1f}{total_us / 1000:>11.1f}  {heaviest}{status}")
+
+
+if __name__ == "__main__":
+    main()
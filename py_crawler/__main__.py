@@ -0,0 +1,4 @@
+# python -m py_crawler <command> ...
+from py_crawler.cli import main
+
+main()
@@ -1,5 +1,6 @@
 import py_crawler.db as db
 from collections import defaultdict
+from py_crawler.config import HLL_PRECISION, CMS_EPSILON, CMS_DELTA, DEGREE_SAMPLE_SIZE
 
 def analyze_graph():
     links = db.get_all_links()
@@ -67,4 +68,83 @@ def analyze_graph():
         print("\n🕳️ Top 10 Rabbit-Hole pages:")
         for u, s in scored[:10]:
             print(
-                f"  - {u}  RHS={s:.3f}  (words={page_words.get(u, 0)}, out={out_degree.get(u, 0)}, in={in_degree.get(u, 0)})")
\ No newline at end of file
+                f"  - {u}  RHS={s:.3f}  (words={page_words.get(u, 0)}, out={out_degree.get(u, 0)}, in={in_degree.get(u, 0)})")
+
+
+def analyze_graph_approx(top=5):
+    """One sequential pass over links with fixed memory; estimates carry error bounds.
+
+    Links arrive grouped by from_url (primary-key order), so edges, sources,
+    out-degrees and the out-degree top list are exact. Targets come in no
+    particular order and are summarized with sketches: HyperLogLog for
+    distinct counts, Count-Min plus a heap for the top in-degree pages and a
+    bottom-k sample for the in-degree distribution.
+    """
+    from py_crawler.sketches import (
+        CountMinSketch, DistinctSample, HyperLogLog, Reservoir, TopK,
+        hash64, quantile_rank_error, quantiles
+    )
+
+    sources = HyperLogLog(HLL_PRECISION)
+    targets = HyperLogLog(HLL_PRECISION)
+    in_cms = CountMinSketch(CMS_EPSILON, CMS_DELTA)
+    top_in = TopK(top)
+    top_out = TopK(top)
+    out_sample = Reservoir(DEGREE_SAMPLE_SIZE)
+    in_sample = DistinctSample(DEGREE_SAMPLE_SIZE)
+
+    edges = 0
+    source_count = 0
+    current, degree = None, 0
+    for from_url, to_url in db.iter_links():
+        if from_url != current:
+            if current is not None:
+                top_out.offer(current, degree)
+                out_sample.add(degree)
+            current, degree = from_url, 0
+            source_count += 1
+            sources.add(from_url)
+        degree += 1
+        edges += 1
+
+        h = hash64(to_url)
+        targets.add_hash(h)
+        top_in.offer(to_url, in_cms.add_hash(h))
+        in_sample.add_hash(h, to_url)
+    if current is not None:
+        top_out.offer(current, degree)
+        out_sample.add(degree)
+
+    nodes = sources.merge(targets).count()
+    target_count = targets.count()
+    # ~95% interval for the HyperLogLog estimates
+    hll_error = 2 * sources.relative_error
+    avg_out = edges / source_count if source_count else 0
+    avg_in = edges / target_count if target_count else 0
+
+    print("📊 Link Graph Stats (approximate, one pass)")
+    print(f"• Nodes crawled: ~{nodes} (±{hll_error:.1%}, 95%)")
+    print(f"• Links (edges): {edges}")
+    print(f"• Average out-degree: {avg_out:.2f}")
+    print(f"• Average in-degree: ~{avg_in:.2f} (±{hll_error:.1%}, 95%)")
+
+    print(f"\n🏆 Top {top} pages by outbound links:")
+    for url, count in top_out.items():
+        print(f"  - {url} → {count} links")
+
+    bound = in_cms.error_bound
+    print(f"\n🎯 Top {top} pages by inbound links (each overcounted by ≤ {bound} with p ≥ {1 - CMS_DELTA:.0%}):")
+    for url, count in top_in.items():
+        print(f"  - {url} ← ~{count} links ({max(count - bound, 0)}–{count})")
+
+    print("\n📈 Degree distribution (sampled):")
+    for label, sample, population, complete in (
+        ("out", out_sample.sample, f"{source_count}", out_sample.seen <= out_sample.size),
+        ("in", in_sample.sample, f"~{target_count}", len(in_sample.counts) < in_sample.size),
+    ):
+        p50, p90, p99 = quantiles(sample)
+        # A sampler that never had to drop anything holds every page: exact
+        detail = f"all {len(sample)} pages" if complete else (
+            f"{len(sample)} of {population} pages, quantile rank error ±{quantile_rank_error(len(sample)):.1%}, 95%"
+        )
+        print(f"  - {label}-degree p50={p50} p90={p90} p99={p99} ({detail})")
@@ -0,0 +1,77 @@
+# py_crawler/autotune.py
+
+import math
+
+from .config import (
+    MIN_WORKERS, WORKERS_LIMIT, AUTOTUNE_LATENCY_TOLERANCE, AUTOTUNE_SMOOTHING,
+    AUTOTUNE_ERROR_RATE, AUTOTUNE_BACKOFF, AUTOTUNE_BASELINE_DRIFT
+)
+
+
+class ConcurrencyTuner:
+    """Picks the worker count for the next batch from the last one's results.
+
+    Gradient control in the style of TCP Vegas / Netflix's Gradient2: while
+    per-request latency stays within AUTOTUNE_LATENCY_TOLERANCE of the best
+    latency seen, the limit grows by about sqrt(limit) per batch; once extra
+    workers only make each request slower (the server, the GIL or SQLite is
+    saturated), the latency ratio pulls the limit back down. An overload
+    rate above AUTOTUNE_ERROR_RATE (timeouts, 429s, 5xx) cuts it
+    multiplicatively; dead links and other client-side failures are not
+    reported to it.
+    """
+
+    def __init__(self, initial, min_workers=MIN_WORKERS, max_workers=WORKERS_LIMIT):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.limit = float(self._clamp(initial))
+        self.baseline = None
+        self.latency = None
+        self.throughput = 0.0
+        self.error_rate = 0.0
+
+    def _clamp(self, value):
+        return max(self.min_workers, min(self.max_workers, value))
+
+    def observe(self, workers, jobs, pages, overloaded, latencies, elapsed):
+        """Feed one batch; returns the worker count to use for the next one.
+
+        workers: limit the batch ran with (may differ after a manual override)
+        jobs: fetch calls submitted; latencies: seconds each of them took
+        pages: pages crawled; overloaded: pages that failed with a timeout,
+        429 or 5xx; elapsed: batch wall time
+        """
+        if workers != round(self.limit):
+            self.limit = float(self._clamp(workers))
+        if not latencies or elapsed <= 0:
+            return round(self.limit)
+
+        self.latency = sum(latencies) / len(latencies)
+        self.throughput = pages / elapsed
+        total = pages + overloaded
+        self.error_rate = overloaded / total if total else 0.0
+        # Best latency seen, allowed to creep up so a slower network is not mistaken for overload
+        if self.baseline is None:
+            self.baseline = self.latency
+        else:
+            self.baseline = min(self.latency, self.baseline * AUTOTUNE_BASELINE_DRIFT)
+
+        if self.error_rate > AUTOTUNE_ERROR_RATE:
+            self.limit = float(self._clamp(self.limit * AUTOTUNE_BACKOFF))
+            return round(self.limit)
+
+        gradient = max(0.5, min(1.0, AUTOTUNE_LATENCY_TOLERANCE * self.baseline / self.latency))
+        # Only probe upwards when every worker was busy; a short frontier says nothing about capacity
+        headroom = math.sqrt(self.limit) if jobs >= workers else 0.0
+        target = self.limit * gradient + headroom
+        self.limit = self._clamp((1 - AUTOTUNE_SMOOTHING) * self.limit + AUTOTUNE_SMOOTHING * target)
+        return round(self.limit)
+
+    def report(self):
+        return {
+            "workers": round(self.limit),
+            "pages_per_sec": round(self.throughput, 2),
+            "latency_ms": round(self.latency * 1000) if self.latency is not None else None,
+            "baseline_ms": round(self.baseline * 1000) if self.baseline is not None else None,
+            "error_rate": round(self.error_rate, 3),
+        }
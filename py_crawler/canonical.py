@@ -0,0 +1,93 @@
+# py_crawler/canonical.py
+
+import threading
+from functools import lru_cache
+from urllib.parse import quote, unquote, urlparse
+
+import py_crawler.db as db
+
+
+def is_valid_wiki_link(href):
+    return href.startswith("/wiki/") and ':' not in href and '#' not in href
+
+
+def title_to_path(title):
+    # Same escaping MediaWiki uses for article hrefs (wfUrlencode)
+    return "/wiki/" + quote(title.replace(" ", "_"), safe=";@$!*(),/~:")
+
+
+def path_to_title(url):
+    return unquote(url[len("/wiki/"):]).replace("_", " ")
+
+
+def normalize_title(title):
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+@lru_cache(maxsize=65536)
+def canonicalize(href):
+    """Normalize a /wiki/ href or article URL to one spelling per title.
+
+    /wiki/Foo_bar, /wiki/Foo%20bar, /wiki/foo_bar and
+    https://en.wikipedia.org/wiki/Foo_bar#History all map to /wiki/Foo_bar.
+    Anything that is not an article path is returned unchanged.
+    """
+    path = urlparse(href).path if "://" in href else href.split("#", 1)[0].split("?", 1)[0]
+    if not path.startswith("/wiki/"):
+        return href
+    return title_to_path(normalize_title(path_to_title(path)))
+
+
+class AliasCache:
+    """Thread-safe alias → canonical URL map backed by the aliases table.
+
+    Fetch workers record() redirects as they discover them; the crawl loop
+    flush()es new entries to the DB from the main thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._map = None
+        self._pending = []
+
+    def _ensure_loaded(self):
+        if self._map is None:
+            self._map = dict(db.get_aliases())
+
+    def resolve(self, url):
+        url = canonicalize(url)
+        with self.lock:
+            self._ensure_loaded()
+            # Follow chained redirects, guarding against loops
+            for _ in range(5):
+                target = self._map.get(url)
+                if target is None or target == url:
+                    break
+                url = target
+        return url
+
+    def record(self, alias, canonical):
+        alias, canonical = canonicalize(alias), canonicalize(canonical)
+        if alias == canonical:
+            return
+        with self.lock:
+            self._ensure_loaded()
+            if self._map.get(alias) != canonical:
+                self._map[alias] = canonical
+                self._pending.append((alias, canonical))
+
+    def flush(self):
+        with self.lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            db.insert_aliases(pending)
+        return pending
+
+    def reset(self):
+        with self.lock:
+            self._map = None
+            self._pending = []
+
+
+aliases = AliasCache()
@@ -1,47 +1,199 @@
 import argparse
 from py_crawler.config import DEFAULT_START_PATH
-import py_crawler.db as db
-from py_crawler.wiki_crawler import crawl_bfs_threaded, print_log
-from py_crawler.export import export_to_json
-from py_crawler.analyze import analyze_graph
-from .config import MAX_WORKERS
+from .config import (
+    MAX_WORKERS, MIN_WORKERS, WORKERS_LIMIT, FETCH_BACKEND, API_URL, FRONTIER_MEMORY_ITEMS,
+    SERVE_WINDOW_SECONDS, SERVE_PAGES_PER_WINDOW
+)
+
+# Each command imports its own dependencies when it runs, so cheap commands
+# (export, analyze, path, ...) never pay for requests, rich or the crawler.
 
 
 def crawl_command(args):
+    import py_crawler.db as db
+    from py_crawler.log import print_log
+    from py_crawler.serve import crawler_lock
+    from py_crawler.wiki_crawler import crawl_bfs_threaded
+
     print("🚀 CLI started")
 
     topic_list = [t.strip().lower() for t in args.topics.split(",")] if args.topics else []
 
-    db.create_tables()
-    start_path = db.get_next_uncrawled(topic_list)
+    # Overlapping runs (e.g. a slow cron job) would crawl the same frontier twice
+    with crawler_lock(db.get_db_path(), args.logfile):
+        db.create_tables()
+        start_path = db.get_next_uncrawled(topic_list)
 
-    if not start_path:
-        print_log("No uncrawled pages in DB. Starting from default seed.", args.logfile)
-        start_path = DEFAULT_START_PATH
-        db.insert_page(start_path, force=True)
+        if not start_path:
+            print_log("No uncrawled pages in DB. Starting from default seed.", args.logfile)
+            start_path = DEFAULT_START_PATH
+            db.insert_page(start_path, force=True)
 
-    print_log(
-        f"🔍 Filtering links by topics: {topic_list}" if topic_list else "🌐 No topic filtering applied",
-        args.logfile
-    )
+        print_log(
+            f"🔍 Filtering links by topics: {topic_list}" if topic_list else "🌐 No topic filtering applied",
+            args.logfile
+        )
+
+        crawl_bfs_threaded(
+            start_path=start_path,
+            max_pages=args.limit,
+            log_file=args.logfile,
+            topics=topic_list,
+            max_depth=args.depth,
+            enumeration=args.enumerate,
+            max_workers=args.workers or MAX_WORKERS,
+            backend=args.backend,
+            api_url=args.api_url,
+            frontier_items=args.frontier_memory,
+            frontier_dir=args.frontier_dir,
+            tuner=make_tuner(args, args.workers or MAX_WORKERS)
+        )
+
+
+def serve_command(args):
+    from py_crawler.serve import serve
 
-    crawl_bfs_threaded(
-        start_path=start_path,
-        max_pages=args.limit,
+    print("🚀 Crawler daemon starting")
+    serve(
         log_file=args.logfile,
-        topics=topic_list,
+        topics=[t.strip().lower() for t in args.topics.split(",") if t.strip()],
         max_depth=args.depth,
-        enumeration=args.enumerate,
-        max_workers=args.workers or MAX_WORKERS
+        workers=args.workers or MAX_WORKERS,
+        backend=args.backend,
+        api_url=args.api_url,
+        frontier_items=args.frontier_memory,
+        frontier_dir=args.frontier_dir,
+        window_seconds=args.window,
+        pages_per_window=args.pages_per_window,
+        sock_path=args.socket,
+        dashboard=args.dashboard,
+        tuner=make_tuner(args, args.workers or MAX_WORKERS)
     )
 
 
+def ctl_command(args):
+    import json
+    import py_crawler.db as db
+    from py_crawler.serve import send_command, socket_path
+
+    path = args.socket or socket_path(db.get_db_path())
+    value = args.value
+    if args.action == "workers":
+        if value is None or not value.isdigit():
+            raise SystemExit("❌ Usage: ctl workers N")
+        value = int(value)
+    elif args.action == "topics":
+        value = value or ""
+
+    try:
+        reply = send_command(path, args.action, value)
+    except (FileNotFoundError, ConnectionRefusedError):
+        raise SystemExit(f"❌ No crawler daemon listening on {path}")
+    print(json.dumps(reply, indent=2))
+    if not reply.get("ok"):
+        raise SystemExit(1)
+
+
 def export_command(args):
-    export_to_json(output_path=args.output)
+    from py_crawler.export import export_to_json, export_edges, export_pages, export_khop_subgraph
+
+    if args.subgraph_seeds:
+        export_khop_subgraph(
+            [s.strip() for s in args.subgraph_seeds.split(",") if s.strip()],
+            args.output,
+            hops=args.hops,
+            direction=args.direction,
+            max_nodes=args.max_nodes,
+            max_edges=args.max_edges,
+            fmt=args.format or "json",
+            compression=args.compress
+        )
+        return
+
+    if args.pages:
+        export_pages(args.output, args.format or "ndjson", args.compress)
+    elif args.format or args.compress:
+        export_edges(args.output, args.format or "ndjson", args.compress)
+    else:
+        export_to_json(args.output)
 
 
 def analyze_command(args):
-    analyze_graph()
+    from py_crawler.analyze import analyze_graph, analyze_graph_approx
+
+    if args.approx:
+        analyze_graph_approx()
+    else:
+        analyze_graph()
+
+
+def path_command(args):
+    from py_crawler.graph import find_path
+
+    find_path(
+        args.from_url,
+        args.to_url,
+        snapshot=args.snapshot,
+        landmarks=args.landmarks,
+        max_hops=args.max_hops
+    )
+
+
+def neighborhood_command(args):
+    from py_crawler.graph import find_neighborhood
+
+    find_neighborhood(args.url, hops=args.hops, direction=args.direction, snapshot=args.snapshot)
+
+
+def ingest_command(args):
+    from py_crawler.ingest import ingest_sql_dumps, ingest_xml_dump
+
+    if args.xml:
+        ingest_xml_dump(args.xml, log_file=args.logfile)
+    if args.page or args.pagelinks:
+        if not (args.page and args.pagelinks):
+            print("❌ --page and --pagelinks must be given together.")
+            return
+        ingest_sql_dumps(args.page, args.pagelinks, args.linktarget, log_file=args.logfile)
+    if not (args.xml or args.page or args.pagelinks):
+        print("❌ No dump given. Use --xml or --page/--pagelinks (see --help).")
+
+
+def merge_command(args):
+    from py_crawler.merge import merge_databases
+
+    merge_databases(args.databases, log_file=args.logfile)
+
+
+def add_autotune_args(parser):
+    parser.add_argument(
+        "--autotune", action="store_true",
+        help="Adjust the worker count after every batch from throughput, latency and errors"
+    )
+    parser.add_argument("--min-workers", type=int, default=MIN_WORKERS, help="Lower bound for --autotune")
+    parser.add_argument("--max-workers", type=int, default=WORKERS_LIMIT, help="Upper bound for --autotune")
+
+
+def make_tuner(args, workers):
+    if not args.autotune:
+        return None
+    from py_crawler.autotune import ConcurrencyTuner
+    return ConcurrencyTuner(workers, args.min_workers, args.max_workers)
+
+
+def add_profile_args(parser):
+    parser.add_argument(
+        "--profile", nargs="?", const="profile", metavar="PREFIX",
+        help="Time hot-path stages and write PREFIX.txt (ranked report) and PREFIX.folded (collapsed stacks)"
+    )
+    parser.add_argument(
+        "--profile-cprofile", action="store_true",
+        help="With --profile, also dump a cProfile of the main thread to PREFIX.prof"
+    )
+    parser.add_argument(
+        "--profile-sample-hz", type=int, default=0, metavar="HZ",
+        help="With --profile, sample all thread stacks at HZ into PREFIX.sampled.folded"
+    )
 
 
 def main():
@@ -56,17 +208,123 @@ def main():
     crawl_parser.add_argument("--topics", type=str, default="")
     crawl_parser.add_argument("--enumerate", action="store_true")
     crawl_parser.add_argument("--workers", type=int, help="Override max thread count")
+    crawl_parser.add_argument("--backend", choices=["html", "api"], default=FETCH_BACKEND,
+                              help="Fetch rendered HTML or batched MediaWiki API link queries")
+    crawl_parser.add_argument("--api-url", type=str, default=API_URL, help="MediaWiki api.php endpoint")
+    crawl_parser.add_argument("--frontier-memory", type=int, default=FRONTIER_MEMORY_ITEMS,
+                              help="Queue entries kept in RAM before spilling to disk")
+    crawl_parser.add_argument("--frontier-dir", type=str, help="Directory for spilled queue segments (default: system temp)")
+    add_autotune_args(crawl_parser)
+    add_profile_args(crawl_parser)
     crawl_parser.set_defaults(func=crawl_command)
 
+    # ── Serve Command ─────────────────────────────────────────────
+    serve_parser = subparsers.add_parser("serve", help="Run the crawler as a daemon with a control socket")
+    serve_parser.add_argument("--window", type=int, default=SERVE_WINDOW_SECONDS, help="Budget window length in seconds")
+    serve_parser.add_argument("--pages-per-window", type=int, default=SERVE_PAGES_PER_WINDOW,
+                              help="Max pages crawled per window")
+    serve_parser.add_argument("--logfile", type=str, default="crawler.log")
+    serve_parser.add_argument("--depth", type=int, default=-1)
+    serve_parser.add_argument("--topics", type=str, default="")
+    serve_parser.add_argument("--workers", type=int, help="Initial thread count (changeable via ctl)")
+    serve_parser.add_argument("--backend", choices=["html", "api"], default=FETCH_BACKEND)
+    serve_parser.add_argument("--api-url", type=str, default=API_URL, help="MediaWiki api.php endpoint")
+    serve_parser.add_argument("--frontier-memory", type=int, default=FRONTIER_MEMORY_ITEMS,
+                              help="Queue entries kept in RAM before spilling to disk")
+    serve_parser.add_argument("--frontier-dir", type=str, help="Directory for spilled queue segments (default: system temp)")
+    serve_parser.add_argument("--socket", type=str, help="Control socket path (default: <db>.sock)")
+    serve_parser.add_argument("--dashboard", action="store_true", help="Render the live stats table to stdout")
+    add_autotune_args(serve_parser)
+    add_profile_args(serve_parser)
+    serve_parser.set_defaults(func=serve_command)
+
+    # ── Ctl Command ───────────────────────────────────────────────
+    ctl_parser = subparsers.add_parser("ctl", help="Control a running crawler daemon")
+    ctl_parser.add_argument("action", choices=["stats", "pause", "resume", "stop", "workers", "topics"])
+    ctl_parser.add_argument("value", nargs="?", help="Worker count, or comma-separated topics ('' clears)")
+    ctl_parser.add_argument("--socket", type=str, help="Control socket path (default: <db>.sock)")
+    ctl_parser.set_defaults(func=ctl_command, profile=None)
+
     # ── Export Command ────────────────────────────────────────────
     export_parser = subparsers.add_parser("export", help="Export crawled links to JSON")
     export_parser.add_argument("--output", type=str, default="links.json")
+    export_parser.add_argument("--subgraph-seeds", type=str, metavar="URLS",
+                               help="Comma-separated seed pages; export only their k-hop induced subgraph")
+    export_parser.add_argument("--hops", type=int, default=1, help="Neighborhood radius for --subgraph-seeds")
+    export_parser.add_argument("--direction", choices=["in", "out", "both"], default="out",
+                               help="Edges followed when expanding; in/both add a permanent links.to_url index on first use")
+    export_parser.add_argument("--max-nodes", type=int, help="Stop expanding once this many pages are selected")
+    export_parser.add_argument("--max-edges", type=int, help="Stop writing after this many edges")
+    export_parser.add_argument("--format", choices=["json", "ndjson", "csv", "edgelist", "parquet"],
+                               help="Stream edges in this format (default: legacy adjacency JSON)")
+    export_parser.add_argument("--compress", choices=["none", "gzip", "zstd"],
+                               help="Output compression (default: from the .gz/.zst extension)")
+    export_parser.add_argument("--pages", action="store_true", help="Export the pages table instead of links")
+    add_profile_args(export_parser)
     export_parser.set_defaults(func=export_command)
 
     # ── Analyze Command ───────────────────────────────────────────
     analyze_parser = subparsers.add_parser("analyze", help="Print link graph stats")
+    analyze_parser.add_argument("--approx", action="store_true",
+                                help="One streaming pass with fixed-memory sketches; reports error bounds")
+    add_profile_args(analyze_parser)
     analyze_parser.set_defaults(func=analyze_command)
 
+    # ── Path Command ──────────────────────────────────────────────
+    path_parser = subparsers.add_parser("path", help="Shortest link path between two articles (JSON)")
+    path_parser.add_argument("from_url", help="Source article (title, /wiki/ path or URL)")
+    path_parser.add_argument("to_url", help="Target article (title, /wiki/ path or URL)")
+    path_parser.add_argument("--snapshot", type=str, help="Graph snapshot file to load, (re)built from the DB when stale")
+    path_parser.add_argument("--landmarks", type=int, default=0, help="Precompute N landmark distances to prune searches")
+    path_parser.add_argument("--max-hops", type=int, default=-1, help="Give up beyond this many hops (-1 = no limit)")
+    add_profile_args(path_parser)
+    path_parser.set_defaults(func=path_command)
+
+    # ── Neighborhood Command ──────────────────────────────────────
+    hood_parser = subparsers.add_parser("neighborhood", help="Stream pages within k hops of an article (NDJSON)")
+    hood_parser.add_argument("url", help="Article (title, /wiki/ path or URL)")
+    hood_parser.add_argument("--hops", type=int, default=1)
+    hood_parser.add_argument("--direction", choices=["out", "in", "both"], default="out")
+    hood_parser.add_argument("--snapshot", type=str, help="Graph snapshot file to load, (re)built from the DB when stale")
+    add_profile_args(hood_parser)
+    hood_parser.set_defaults(func=neighborhood_command)
+
+    # ── Ingest Command ────────────────────────────────────────────
+    ingest_parser = subparsers.add_parser("ingest", help="Bulk-load pages and links from Wikipedia dumps")
+    ingest_parser.add_argument("--page", metavar="FILE", help="page.sql dump (.gz/.bz2 ok)")
+    ingest_parser.add_argument("--pagelinks", metavar="FILE", help="pagelinks.sql dump (.gz/.bz2 ok)")
+    ingest_parser.add_argument("--linktarget", metavar="FILE", help="linktarget.sql dump, for post-2024 pagelinks")
+    ingest_parser.add_argument("--xml", metavar="FILE", help="pages-articles XML dump (.gz/.bz2 ok)")
+    ingest_parser.add_argument("--logfile", type=str, default="crawler.log")
+    add_profile_args(ingest_parser)
+    ingest_parser.set_defaults(func=ingest_command)
+
+    # ── Merge Command ─────────────────────────────────────────────
+    merge_parser = subparsers.add_parser("merge", help="Merge other crawler databases into this one")
+    merge_parser.add_argument("databases", nargs="+", metavar="DB", help="Source wiki_links.db files")
+    merge_parser.add_argument("--logfile", type=str, default="crawler.log")
+    add_profile_args(merge_parser)
+    merge_parser.set_defaults(func=merge_command)
+
     # ── Parse and Execute ─────────────────────────────────────────
     args = parser.parse_args()
-    args.func(args)
+    if not args.profile:
+        args.func(args)
+        return
+
+    from py_crawler import profiler
+
+    profiler.enable(
+        args.profile,
+        root=args.command,
+        use_cprofile=args.profile_cprofile,
+        sample_hz=args.profile_sample_hz
+    )
+    try:
+        args.func(args)
+    finally:
+        profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,15 +18,57 @@ MAX_WORKERS = 10
 # -1 gives no limit
 MAX_CHILDREN = -1
 
+# Frontier entries kept in memory before the queue tail spills to disk
+FRONTIER_MEMORY_ITEMS = 200000
+
 # Delay between requests
 SLEEP_TIME = 0.1
 
+# HTML fetches are streamed FETCH_CHUNK_BYTES at a time; bodies are cut off
+# after MAX_BODY_BYTES (decompressed) and extracted from what arrived
+FETCH_CHUNK_BYTES = 64 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+# Stop reading once the article body and its categories have been parsed
+STOP_AFTER_CONTENT = True
+# After an early stop, read at most this much more so the connection can be reused
+FETCH_DRAIN_BYTES = 64 * 1024
+
 # Start here if database is empty
 DEFAULT_START_PATH = "/wiki/Web_crawler"
 
 # Base Wikipedia URL
 BASE_URL = "https://en.wikipedia.org"
+
+# Fetch backend: "html" parses rendered articles, "api" uses the MediaWiki Action API
+FETCH_BACKEND = "html"
+API_URL = BASE_URL + "/w/api.php"
+# The API accepts at most 50 titles per query
+API_BATCH_SIZE = 50
+USER_AGENT = "py_crawler/0.1 (Wikipedia BFS crawler)"
 MAX_SESSION_PAGES = 500
 RETRY_ATTEMPTS = 2
 
-LOG_FILE = "crawler.log"
\ No newline at end of file
+LOG_FILE = "crawler.log"
+
+# analyze --approx: sketch sizes (fixed memory, independent of graph size)
+HLL_PRECISION = 14          # 16 KiB of registers, ~0.8% standard error
+CMS_EPSILON = 0.0005        # in-degree overestimate ≤ CMS_EPSILON × edges ...
+CMS_DELTA = 0.01            # ... with probability 1 - CMS_DELTA
+DEGREE_SAMPLE_SIZE = 10000  # nodes kept for degree quantiles
+
+# serve mode: crawl at most SERVE_PAGES_PER_WINDOW pages every SERVE_WINDOW_SECONDS
+SERVE_WINDOW_SECONDS = 900
+SERVE_PAGES_PER_WINDOW = 100
+# Bounds on worker threads when the count can change at runtime (ctl, --autotune)
+MIN_WORKERS = 2
+WORKERS_LIMIT = 64
+
+# --autotune: per-request latency may reach this multiple of the best seen before workers are shed
+AUTOTUNE_LATENCY_TOLERANCE = 1.25
+# Weight of each batch's target when moving the worker limit
+AUTOTUNE_SMOOTHING = 0.2
+# Failure fraction per batch that triggers a multiplicative backoff
+AUTOTUNE_ERROR_RATE = 0.1
+AUTOTUNE_BACKOFF = 0.75
+# Per-batch growth allowed in the best-latency baseline
+AUTOTUNE_BASELINE_DRIFT = 1.001
\ No newline at end of file
@@ -4,13 +4,11 @@ from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
+from .config import MAX_WORKERS, RETRY_ATTEMPTS
 from .progress import CrawlStats
 from .db import insert_page, insert_links, mark_crawled, is_crawled
 from .utils import fetch_links, print_log
 
-MAX_WORKERS = 8
-RETRY_ATTEMPTS = 2
-
 
 def crawl_bfs_threaded(start_path, max_pages, log_file, topics, max_depth, enumerate=False):
     stats = CrawlStats(topics, max_depth)
@@ -2,6 +2,8 @@ import sqlite3
 import os
 
 DB_NAME = "wiki_links.db"
+# Rows pulled per fetchmany() by iter_rows
+STREAM_BATCH_ROWS = 10000
 
 def get_db_path():
     return os.environ.get("WIKI_DB_PATH", DB_NAME)
@@ -24,12 +26,27 @@ def create_tables():
                 PRIMARY KEY (from_url, to_url)
             )
         """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS categories (
+                url TEXT,
+                category TEXT,
+                PRIMARY KEY (url, category)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias TEXT PRIMARY KEY,
+                canonical TEXT NOT NULL
+            )
+        """)
         conn.commit()
 
         if not _column_exists(conn, "pages", "word_count"):
             cursor.execute("ALTER TABLE pages ADD COLUMN word_count INTEGER")
         if not _column_exists(conn, "pages", "out_links"):
             cursor.execute("ALTER TABLE pages ADD COLUMN out_links INTEGER")
+        if not _column_exists(conn, "pages", "title"):
+            cursor.execute("ALTER TABLE pages ADD COLUMN title TEXT")
         conn.commit()
 
 def _column_exists(conn, table, column):
@@ -37,6 +54,10 @@ def _column_exists(conn, table, column):
     cur.execute("PRAGMA table_info(%s)" % table)
     return any(row[1] == column for row in cur.fetchall())
 
+def page_columns(conn, schema="main"):
+    # Older databases predate the metric and title columns; callers only read what is there
+    return {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(pages)")}
+
 def set_page_metrics(url, word_count, out_links):
     with sqlite3.connect(get_db_path()) as conn:
         cur = conn.cursor()
@@ -57,30 +78,98 @@ def insert_page(url, force=False):
         conn.commit()
 
 def insert_links(from_url, to_urls):
+    # Known redirect aliases are stored under their canonical URL
     with sqlite3.connect(get_db_path()) as conn:
         cursor = conn.cursor()
         cursor.executemany(
-            "INSERT OR IGNORE INTO pages (url, crawled) VALUES (?, 0)",
+            "INSERT OR IGNORE INTO pages (url, crawled) "
+            "VALUES (COALESCE((SELECT canonical FROM aliases WHERE alias = ?1), ?1), 0)",
             [(url,) for url in to_urls]
         )
         cursor.executemany(
-            "INSERT OR IGNORE INTO links (from_url, to_url) VALUES (?, ?)",
+            "INSERT OR IGNORE INTO links (from_url, to_url) "
+            "VALUES (?1, COALESCE((SELECT canonical FROM aliases WHERE alias = ?2), ?2))",
             [(from_url, to_url) for to_url in to_urls]
         )
         conn.commit()
 
+def store_pages(pages, also_crawled=(), failed=()):
+    """Write a batch of crawled pages, their links and metrics in one transaction.
+
+    pages: iterable of (url, to_urls, word_count, out_links, title, categories)
+    also_crawled: alias URLs to mark crawled alongside their canonical page
+    failed: URLs to mark failed for good (see mark_failed)
+    """
+    with sqlite3.connect(get_db_path()) as conn:
+        cursor = conn.cursor()
+        page_rows = []
+        for url, to_urls, word_count, out_links, title, categories in pages:
+            cursor.executemany(
+                "INSERT OR IGNORE INTO pages (url, crawled) "
+                "VALUES (COALESCE((SELECT canonical FROM aliases WHERE alias = ?1), ?1), 0)",
+                [(to_url,) for to_url in to_urls]
+            )
+            cursor.executemany(
+                "INSERT OR IGNORE INTO links (from_url, to_url) "
+                "VALUES (?1, COALESCE((SELECT canonical FROM aliases WHERE alias = ?2), ?2))",
+                [(url, to_url) for to_url in to_urls]
+            )
+            cursor.executemany(
+                "INSERT OR IGNORE INTO categories (url, category) VALUES (?, ?)",
+                [(url, category) for category in categories]
+            )
+            page_rows.append((url, word_count, out_links, title))
+
+        cursor.executemany(
+            """
+            INSERT INTO pages (url, crawled, word_count, out_links, title) VALUES (?, 1, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                crawled = 1,
+                word_count = COALESCE(excluded.word_count, word_count),
+                out_links = COALESCE(excluded.out_links, out_links),
+                title = COALESCE(excluded.title, title)
+            """,
+            page_rows
+        )
+        cursor.executemany("UPDATE pages SET crawled = 1 WHERE url = ?", [(url,) for url in also_crawled])
+        cursor.executemany("UPDATE pages SET crawled = -1 WHERE url = ? AND crawled = 0", [(url,) for url in failed])
+        conn.commit()
+
+def insert_aliases(pairs):
+    with sqlite3.connect(get_db_path()) as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT OR REPLACE INTO aliases (alias, canonical) VALUES (?, ?)",
+            pairs
+        )
+        conn.commit()
+
+def get_aliases():
+    with sqlite3.connect(get_db_path()) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT alias, canonical FROM aliases")
+        return cursor.fetchall()
+
 def mark_crawled(url):
     with sqlite3.connect(get_db_path()) as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE pages SET crawled = 1 WHERE url = ?", (url,))
         conn.commit()
 
+def mark_failed(url):
+    # crawled = -1: gave up on the page; never queued or picked as a seed again
+    with sqlite3.connect(get_db_path()) as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE pages SET crawled = -1 WHERE url = ? AND crawled = 0", (url,))
+        conn.commit()
+
 def is_crawled(url):
+    # Failed pages count as done too, so BFS does not fetch them again
     with sqlite3.connect(get_db_path()) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT crawled FROM pages WHERE url = ?", (url,))
         row = cursor.fetchone()
-        return row and row[0] == 1
+        return bool(row) and row[0] != 0
 
 def get_next_uncrawled(topics=None):
     with sqlite3.connect(get_db_path()) as conn:
@@ -98,8 +187,43 @@ def get_next_uncrawled(topics=None):
         row = cursor.fetchone()
         return row[0] if row else None
 
+def has_reverse_index():
+    with sqlite3.connect(get_db_path()) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_links_to'")
+        return cursor.fetchone() is not None
+
+def ensure_reverse_index():
+    # Only built when something needs in-link lookups; crawl writes stay cheaper without it.
+    # Once built it is permanent: every later links insert also maintains it.
+    with sqlite3.connect(get_db_path()) as conn:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_links_to ON links (to_url)")
+        conn.commit()
+
 def get_all_links():
     with sqlite3.connect(get_db_path()) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT from_url, to_url FROM links")
         return cursor.fetchall()
+
+def iter_rows(sql, params=(), conn=None, batch_rows=STREAM_BATCH_ROWS):
+    """Yield rows of a query in fetchmany() batches instead of fetchall().
+
+    Opens (and closes) its own connection unless one is passed in.
+    """
+    own = conn is None
+    conn = conn or sqlite3.connect(get_db_path())
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        if own:
+            conn.close()
+
+def iter_links():
+    # Primary-key order: one sequential covering-index scan, grouped by from_url
+    return iter_rows("SELECT from_url, to_url FROM links ORDER BY from_url, to_url")
@@ -3,60 +3,312 @@
 import sqlite3
 import json
 import csv
+import gzip
+import io
+import itertools
+import struct
 import argparse
-from py_crawler.config import DEFAULT_DB_PATH
-from py_crawler.db import get_all_links
+from py_crawler.canonical import canonicalize
+from py_crawler.db import ensure_reverse_index, get_db_path, has_reverse_index, iter_rows, page_columns
+from py_crawler.graph import to_wiki_path
 
+# Bound on host parameters per IN (...) lookup
+LOOKUP_CHUNK = 500
+# Rows per parquet record batch; exports never hold more than this in memory
+EXPORT_BATCH_ROWS = 10000
 
-def export_to_json_from_path(output_path):
-    conn = sqlite3.connect(DEFAULT_DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT from_url, to_url FROM links")
-    edges = [{"from": row[0], "to": row[1]} for row in cur.fetchall()]
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(edges, f, indent=2)
-    print(f"✅ Exported {len(edges)} edges to {output_path}")
+EXPORT_FORMATS = ["json", "ndjson", "csv", "edgelist", "parquet"]
+COMPRESSIONS = ["none", "gzip", "zstd"]
 
-def export_to_json(filename="links.json"):
-    links = get_all_links()
+EDGE_SQL = "SELECT from_url, to_url FROM links"
+PAGE_COLUMNS = ["url", "crawled", "word_count", "out_links", "title"]
+# Everything else is TEXT
+INTEGER_COLUMNS = {"crawled", "word_count", "out_links"}
+
+
+# ── Streaming primitives ─────────────────────────────────────────
+def resolve_compression(path, compression=None):
+    if compression:
+        return compression
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def open_binary(path, compression="none"):
+    if compression == "gzip":
+        return gzip.open(path, "wb")
+    if compression == "zstd":
+        try:
+            from compression import zstd  # Python 3.14+
+            return zstd.open(path, "wb")
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("❌ zstd compression needs Python 3.14+ or the 'zstandard' package.")
+        return zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+    return open(path, "wb")
+
+
+def open_text(path, compression="none"):
+    return io.TextIOWrapper(open_binary(path, compression), encoding="utf-8", newline="")
+
+
+def write_json_array(f, items):
+    count = 0
+    f.write("[")
+    for item in items:
+        f.write(",\n  " if count else "\n  ")
+        f.write(json.dumps(item, ensure_ascii=False))
+        count += 1
+    f.write("\n]\n")
+    return count
+
+
+def write_records(path, columns, rows, fmt="ndjson", compression=None, keys=None):
+    """Stream rows to path as json, ndjson, csv or parquet; returns the row count.
+
+    keys renames columns in the JSON formats (e.g. from_url → from).
+    """
+    if fmt == "parquet":
+        return write_parquet(path, columns, rows, compression)
+    if fmt not in ("json", "ndjson", "csv"):
+        raise ValueError(f"unsupported record format {fmt!r}")
+    keys = keys or columns
+    with open_text(path, resolve_compression(path, compression)) as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            count = 0
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+            return count
+        if fmt == "json":
+            return write_json_array(f, (dict(zip(keys, row)) for row in rows))
+        count = 0
+        for row in rows:
+            f.write(json.dumps(dict(zip(keys, row)), ensure_ascii=False) + "\n")
+            count += 1
+        return count
+
+
+# ── Full-graph exports ───────────────────────────────────────────
+def export_edges(output_path, fmt="ndjson", compression=None):
+    """Stream every edge in the chosen format with constant memory."""
+    if fmt == "edgelist":
+        return export_edgelist(output_path, compression)
+    if fmt == "parquet":
+        return export_parquet(output_path, EDGE_SQL, ["from_url", "to_url"], compression)
+
+    count = write_records(
+        output_path, ["from_url", "to_url"], iter_rows(EDGE_SQL), fmt, compression, keys=["from", "to"]
+    )
+    print(f"✅ Exported {count} edges to {output_path}")
+    return count
+
+
+def export_pages(output_path, fmt="ndjson", compression=None, crawled_only=False):
+    if fmt == "edgelist":
+        raise SystemExit("❌ The edgelist format only applies to edges.")
+    with sqlite3.connect(get_db_path()) as conn:
+        present = page_columns(conn)
+    columns = [c for c in PAGE_COLUMNS if c in present]
+    sql = f"SELECT {', '.join(columns)} FROM pages" + (" WHERE crawled = 1" if crawled_only else "")
+    if fmt == "parquet":
+        return export_parquet(output_path, sql, columns, compression)
+
+    count = write_records(output_path, columns, iter_rows(sql), fmt, compression)
+    print(f"✅ Exported {count} pages to {output_path}")
+    return count
+
+
+def export_edgelist(output_path, compression=None):
+    """Binary edge list: little-endian int64 (from_id, to_id) pairs.
+
+    Node ids are pages.rowid; the id → url table is streamed alongside to
+    <output>.nodes.tsv (compressed the same way).
+    """
+    compression = resolve_compression(output_path, compression)
+    suffix = {"gzip": ".gz", "zstd": ".zst"}.get(compression, "")
+    base = output_path[:-len(suffix)] if suffix and output_path.endswith(suffix) else output_path
+    nodes_path = f"{base}.nodes.tsv{suffix}"
 
-    graph = {}
-    for from_url, to_url in links:
-        graph.setdefault(from_url, []).append(to_url)
+    conn = sqlite3.connect(get_db_path())
+    try:
+        nodes = 0
+        with open_text(nodes_path, compression) as f:
+            for rowid, url in iter_rows("SELECT rowid, url FROM pages ORDER BY rowid", conn=conn):
+                f.write(f"{rowid}\t{url}\n")
+                nodes += 1
 
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(graph, f, indent=2)
+        pair = struct.Struct("<qq")
+        edges = 0
+        with open_binary(output_path, compression) as f:
+            # Both lookups go through the pages primary key; rows stream in links order
+            for from_id, to_id in iter_rows("""
+                SELECT p1.rowid, p2.rowid
+                FROM links l
+                JOIN pages p1 ON p1.url = l.from_url
+                JOIN pages p2 ON p2.url = l.to_url
+            """, conn=conn):
+                f.write(pair.pack(from_id, to_id))
+                edges += 1
+    finally:
+        conn.close()
 
-    print(f"✅ Exported {len(links)} links to {filename}")
+    print(f"✅ Exported {edges} edges ({nodes} node ids in {nodes_path}) to {output_path}")
+    return edges
+
+
+def write_parquet(output_path, columns, rows, compression=None):
+    """Columnar export, written one record batch per EXPORT_BATCH_ROWS rows."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("❌ The parquet format needs the optional 'pyarrow' package.")
+
+    codec = {None: "zstd", "none": "none", "gzip": "gzip", "zstd": "zstd"}[compression]
+    # Fixed up front: a batch whose nullable column is all NULL would otherwise be typed `null`
+    schema = pa.schema([(name, pa.int64() if name in INTEGER_COLUMNS else pa.string()) for name in columns])
+    rows = iter(rows)
+    count = 0
+    with pq.ParquetWriter(output_path, schema, compression=codec) as writer:
+        while True:
+            batch = list(itertools.islice(rows, EXPORT_BATCH_ROWS))
+            if not batch:
+                break
+            table = {name: [row[i] for row in batch] for i, name in enumerate(columns)}
+            writer.write_table(pa.table(table, schema=schema))
+            count += len(batch)
+    return count
+
+
+def export_parquet(output_path, sql, columns, compression=None):
+    count = write_parquet(output_path, columns, iter_rows(sql), compression)
+    print(f"✅ Exported {count} rows to {output_path}")
+    return count
+
+
+# ── Legacy exports (same output shapes, now streamed) ────────────
+def export_to_json_from_path(output_path):
+    with open_text(output_path) as f:
+        count = write_json_array(f, ({"from": a, "to": b} for a, b in iter_rows(EDGE_SQL)))
+    print(f"✅ Exported {count} edges to {output_path}")
+
+def export_to_json(filename="links.json"):
+    # Adjacency object {from_url: [to_url, ...]}, grouped in primary-key order
+    count = 0
+    current = None
+    with open_text(filename) as f:
+        f.write("{")
+        for from_url, to_url in iter_rows(EDGE_SQL + " ORDER BY from_url"):
+            if from_url != current:
+                f.write("\n  ]," if current is not None else "")
+                f.write(f"\n  {json.dumps(from_url, ensure_ascii=False)}: [")
+                current = from_url
+                first = True
+            f.write(("" if first else ",") + f"\n    {json.dumps(to_url, ensure_ascii=False)}")
+            first = False
+            count += 1
+        f.write("\n  ]\n}\n" if current is not None else "}\n")
+
+    print(f"✅ Exported {count} links to {filename}")
 
 def export_to_csv(output_path):
-    conn = sqlite3.connect(DEFAULT_DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT from_url, to_url FROM links")
-    rows = cur.fetchall()
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["from_url", "to_url"])
-        writer.writerows(rows)
-    print(f"✅ Exported {len(rows)} edges to {output_path}")
+    count = write_records(output_path, ["from_url", "to_url"], iter_rows(EDGE_SQL), "csv", "none")
+    print(f"✅ Exported {count} edges to {output_path}")
 
 def export_crawled_pages(output_path):
-    conn = sqlite3.connect(DEFAULT_DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT url FROM pages WHERE crawled = 1")
-    urls = [row[0] for row in cur.fetchall()]
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(urls, f, indent=2)
-    print(f"✅ Exported {len(urls)} crawled pages to {output_path}")
+    with open_text(output_path) as f:
+        count = write_json_array(f, (url for (url,) in iter_rows("SELECT url FROM pages WHERE crawled = 1")))
+    print(f"✅ Exported {count} crawled pages to {output_path}")
 
 def export_subgraph(prefix, output_path):
-    conn = sqlite3.connect(DEFAULT_DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT from_url, to_url FROM links WHERE from_url LIKE ?", (prefix + "%",))
-    edges = [{"from": row[0], "to": row[1]} for row in cur.fetchall()]
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(edges, f, indent=2)
-    print(f"✅ Exported {len(edges)} edges from subgraph prefix '{prefix}' to {output_path}")
+    rows = iter_rows(EDGE_SQL + " WHERE from_url LIKE ?", (prefix + "%",))
+    with open_text(output_path) as f:
+        count = write_json_array(f, ({"from": a, "to": b} for a, b in rows))
+    print(f"✅ Exported {count} edges from subgraph prefix '{prefix}' to {output_path}")
+
+def _neighbors(conn, urls, direction):
+    """Yield (from_url, to_url) edges touching urls, via the links PK / to_url index."""
+    urls = list(urls)
+    for i in range(0, len(urls), LOOKUP_CHUNK):
+        chunk = urls[i:i + LOOKUP_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        if direction in ("out", "both"):
+            yield from conn.execute(f"SELECT from_url, to_url FROM links WHERE from_url IN ({marks})", chunk)
+        if direction in ("in", "both"):
+            yield from conn.execute(f"SELECT from_url, to_url FROM links WHERE to_url IN ({marks})", chunk)
+
+
+def export_khop_subgraph(seeds, output_path, hops=1, direction="out", max_nodes=None, max_edges=None,
+                         fmt="json", compression=None):
+    """Export the subgraph induced by every page within `hops` of the seeds.
+
+    The neighborhood is expanded one level at a time with indexed lookups,
+    stopping early at max_nodes; the induced edges are then streamed to
+    output_path as they are read, up to max_edges. Following in-links
+    ("in"/"both") needs an index on links.to_url: the first such export
+    builds it, and it stays in the DB for later exports and crawls.
+    """
+    if fmt == "edgelist":
+        raise SystemExit("❌ The edgelist format only applies to full edge exports, not subgraphs.")
+    if direction in ("in", "both") and not has_reverse_index():
+        print("🔧 Building the links.to_url index for in-link lookups. This is a one-time full-table pass; "
+              "the index stays in the DB and adds a little to every later crawl insert "
+              "(DROP INDEX idx_links_to removes it).")
+        ensure_reverse_index()
+
+    conn = sqlite3.connect(get_db_path())
+
+    nodes = {canonicalize(to_wiki_path(seed)) for seed in seeds}
+    frontier = list(nodes)
+    truncated = False
+    for _ in range(hops):
+        nxt = []
+        for from_url, to_url in _neighbors(conn, frontier, direction):
+            for url in (from_url, to_url):
+                if url in nodes:
+                    continue
+                if max_nodes is not None and len(nodes) >= max_nodes:
+                    truncated = True
+                    break
+                nodes.add(url)
+                nxt.append(url)
+            if truncated:
+                break
+        if truncated or not nxt:
+            break
+        frontier = nxt
+
+    budget = {"edges": 0, "truncated": truncated}
+
+    def induced_edges():
+        for from_url, to_url in _neighbors(conn, nodes, "out"):
+            if to_url not in nodes:
+                continue
+            if max_edges is not None and budget["edges"] >= max_edges:
+                budget["truncated"] = True
+                return
+            budget["edges"] += 1
+            yield from_url, to_url
+
+    edges = write_records(
+        output_path, ["from_url", "to_url"], induced_edges(), fmt, compression, keys=["from", "to"]
+    )
+    truncated = budget["truncated"]
+    conn.close()
+
+    note = " (budget reached, truncated)" if truncated else ""
+    print(f"✅ Exported {len(nodes)} nodes / {edges} edges within {hops} hops ({direction}) to {output_path}{note}")
+    return len(nodes), edges
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Export Wikipedia link data from SQLite.")
@@ -64,7 +316,18 @@ def parse_args():
     parser.add_argument("--csv", metavar="FILE", help="Export full graph to CSV file")
     parser.add_argument("--crawled", metavar="FILE", help="Export list of crawled pages to JSON file")
     parser.add_argument("--subgraph", metavar="PREFIX", help="Export subgraph starting from pages with this prefix")
+    parser.add_argument("--subgraph-seeds", metavar="URLS", help="Comma-separated seed pages for a k-hop subgraph export")
+    parser.add_argument("--hops", type=int, default=1, help="Neighborhood radius for --subgraph-seeds")
+    parser.add_argument("--direction", choices=["in", "out", "both"], default="out",
+                        help="Edges followed when expanding; in/both add a permanent links.to_url index on first use")
+    parser.add_argument("--max-nodes", type=int, help="Node budget for --subgraph-seeds")
+    parser.add_argument("--max-edges", type=int, help="Edge budget for --subgraph-seeds")
     parser.add_argument("--output", metavar="FILE", default="subgraph.json", help="Output file for subgraph export")
+    parser.add_argument("--edges", metavar="FILE", help="Stream all edges in --format")
+    parser.add_argument("--pages", metavar="FILE", help="Stream the pages table in --format")
+    parser.add_argument("--format", choices=EXPORT_FORMATS,
+                        help="Format for --edges/--pages (default: ndjson) or --subgraph-seeds (default: json)")
+    parser.add_argument("--compress", choices=COMPRESSIONS, help="Output compression (default: from file extension)")
     return parser.parse_args()
 
 def cli():
@@ -78,8 +341,17 @@ def cli():
         export_crawled_pages(args.crawled)
     if args.subgraph:
         export_subgraph(args.subgraph, args.output)
+    if args.subgraph_seeds:
+        export_khop_subgraph(
+            [s.strip() for s in args.subgraph_seeds.split(",") if s.strip()], args.output, args.hops, args.direction,
+            args.max_nodes, args.max_edges, args.format or "json", args.compress
+        )
+    if args.edges:
+        export_edges(args.edges, args.format or "ndjson", args.compress)
+    if args.pages:
+        export_pages(args.pages, args.format or "ndjson", args.compress)
 
-    if not (args.json or args.csv or args.crawled or args.subgraph):
+    if not (args.json or args.csv or args.crawled or args.subgraph or args.subgraph_seeds or args.edges or args.pages):
         print("❌ No export option selected. Use --help to see available options.")
 
 def main():
@@ -0,0 +1,211 @@
+# py_crawler/extract.py
+
+import codecs
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlparse
+
+CONTENT_ID = "mw-content-text"
+# Category links follow the content region; nothing after them is extracted
+CATLINKS_ID = "catlinks"
+CATEGORY_PREFIX = "/wiki/Category:"
+SKIP_TEXT_TAGS = {"script", "style"}
+# Elements that never get a closing tag and so must not affect nesting depth
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+class PageFeatures:
+    """Per-page metrics produced alongside the links by one extraction pass."""
+
+    __slots__ = ("word_count", "out_links", "title", "categories")
+
+    def __init__(self, word_count=None, out_links=None, title=None, categories=()):
+        self.word_count = word_count
+        self.out_links = out_links
+        self.title = title
+        self.categories = list(categories)
+
+
+class PageExtractor(HTMLParser):
+    """Single-pass extractor for a rendered Wikipedia article.
+
+    Collects every anchor (href and text), the rough word count of the main
+    content, the page title, its categories and the rel=canonical URL while
+    the HTML is tokenized, without building a document tree. Text can be
+    pushed in with feed() as it arrives; once `done` is set, the rest of the
+    page (footer, navigation) holds nothing the crawler uses.
+    """
+
+    def __init__(self, stop_after_content=False):
+        super().__init__(convert_charrefs=True)
+        # Ignore everything once done, however much of the page was fed
+        self.stop_after_content = stop_after_content
+        self.anchors = []
+        self.word_count = 0
+        self.title = None
+        self.categories = []
+        self.canonical = None
+
+        self._stack = []
+        self._content_level = None
+        self._content_seen = False
+        self._catlinks_level = None
+        self._catlinks_seen = False
+        self._skip_depth = 0
+        self._anchor = None
+        self._heading = None
+        self._doc_title = None
+        self._all_words = 0
+        # Text runs can arrive split across feed() chunks; they are buffered
+        # and processed whole at the next tag, as a single feed() would see them
+        self._pending = []
+
+    # ── Tokenizer callbacks ──────────────────────────────────────
+    def handle_starttag(self, tag, attrs):
+        if self._pending:
+            self._flush_text()
+        if self.stop_after_content and self.done:
+            return
+        if tag in VOID_TAGS:
+            if tag == "link" and self.canonical is None:
+                attrs = dict(attrs)
+                if attrs.get("rel") == "canonical" and attrs.get("href"):
+                    self.canonical = urlparse(attrs["href"]).path
+            return
+
+        self._stack.append(tag)
+        if tag == "a":
+            href = dict(attrs).get("href")
+            self._anchor = (href, []) if href else None
+        elif tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag == "title" and self._doc_title is None:
+            self._doc_title = []
+        elif self._content_level is None or tag == "h1":
+            attrs = dict(attrs)
+            if attrs.get("id") == CONTENT_ID and not self._content_seen:
+                self._content_level = len(self._stack)
+                self._content_seen = True
+            elif attrs.get("id") == CATLINKS_ID and not self._catlinks_seen:
+                self._catlinks_level = len(self._stack)
+                self._catlinks_seen = True
+            elif tag == "h1" and attrs.get("id") == "firstHeading":
+                self._heading = []
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <link .../> and friends: same as an opening tag with no body
+        if tag in VOID_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self._pending:
+            self._flush_text()
+        if tag not in self._stack:
+            return
+        # Pop up to the matching open tag, closing anything left implicitly open
+        while self._stack:
+            open_tag = self._stack.pop()
+            self._close(open_tag)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag):
+        if tag == "a" and self._anchor is not None:
+            href, parts = self._anchor
+            self.anchors.append((href, "".join(p.strip() for p in parts)))
+            if href.startswith(CATEGORY_PREFIX):
+                self.categories.append(unquote(href[len(CATEGORY_PREFIX):]).replace("_", " "))
+            self._anchor = None
+        elif tag in SKIP_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title" and isinstance(self._doc_title, list):
+            self._doc_title = "".join(self._doc_title).strip()
+        elif tag == "h1" and self._heading is not None:
+            self.title = " ".join("".join(self._heading).split())
+            self._heading = None
+
+        if self._content_level is not None and len(self._stack) < self._content_level:
+            self._content_level = None
+        if self._catlinks_level is not None and len(self._stack) < self._catlinks_level:
+            self._catlinks_level = None
+
+    def handle_comment(self, data):
+        if self._pending:
+            self._flush_text()
+
+    def handle_data(self, data):
+        if not (self.stop_after_content and self.done):
+            self._pending.append(data)
+
+    def close(self):
+        super().close()
+        if self._pending:
+            self._flush_text()
+
+    def _flush_text(self):
+        data = "".join(self._pending)
+        self._pending.clear()
+        if self._skip_depth:
+            return
+        if self._anchor is not None:
+            self._anchor[1].append(data)
+        if self._heading is not None:
+            self._heading.append(data)
+        if isinstance(self._doc_title, list):
+            self._doc_title.append(data)
+
+        words = sum(1 for w in data.split() if w.isalpha())
+        self._all_words += words
+        if self._content_level is not None:
+            self.word_count += words
+
+    # ── Results ──────────────────────────────────────────────────
+    @property
+    def done(self):
+        """True once the content region and the category block have both closed."""
+        return (
+            self._content_seen and self._content_level is None
+            and self._catlinks_seen and self._catlinks_level is None
+        )
+
+    def features(self, out_links):
+        title = self.title
+        if not title and isinstance(self._doc_title, str):
+            title = self._doc_title.rsplit(" - ", 1)[0]
+        # Without a content container, fall back to the whole page like get_text() did
+        word_count = self.word_count if self._content_seen else self._all_words
+        return PageFeatures(word_count, out_links, title, dict.fromkeys(self.categories))
+
+
+def extract_page(html):
+    extractor = PageExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor
+
+
+def extract_stream(chunks, encoding="utf-8", max_bytes=None, stop_early=True):
+    """Decode byte chunks incrementally and push them through a PageExtractor.
+
+    Only one chunk is held at a time. Reading stops once max_bytes have been
+    consumed (the page is extracted from what arrived) or, with stop_early,
+    as soon as the extractor is done. Returns (extractor, bytes_read,
+    truncated).
+    """
+    extractor = PageExtractor(stop_after_content=stop_early)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    size = 0
+    truncated = False
+    for chunk in chunks:
+        if max_bytes is not None and size + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - size]
+            truncated = True
+        size += len(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if truncated or (stop_early and extractor.done):
+            break
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return extractor, size, truncated
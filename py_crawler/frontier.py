@@ -0,0 +1,113 @@
+# py_crawler/frontier.py
+
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from collections import deque
+
+from .config import FRONTIER_MEMORY_ITEMS
+
+
+class _Block:
+    """A run of frontier entries: interned URLs plus a parallel depth array."""
+
+    __slots__ = ("urls", "depths", "pos")
+
+    def __init__(self):
+        self.urls = []
+        self.depths = array("i")
+        self.pos = 0
+
+    def __len__(self):
+        return len(self.urls) - self.pos
+
+
+class SpillingFrontier:
+    """FIFO of (url, depth) pairs that keeps at most ~max_items in memory.
+
+    Entries are consumed from an in-memory head block and appended to an
+    in-memory tail block. When the tail fills up it is written out as a
+    sequential segment file; segments are read back one at a time, oldest
+    first, once the head is drained. BFS order is therefore preserved
+    exactly: head, then segments in order, then tail.
+
+    Drop-in for the deque operations the crawler uses: append, popleft,
+    len() and truthiness.
+    """
+
+    def __init__(self, items=(), max_items=FRONTIER_MEMORY_ITEMS, spill_dir=None):
+        self.segment_items = max(1, max_items // 2)
+        self.spill_dir = spill_dir
+        self._dir = None
+        self._segments = deque()  # (path, count), oldest first
+        self._next_segment = 0
+        self._spilled = 0
+        self._head = _Block()
+        self._tail = _Block()
+        for item in items:
+            self.append(item)
+
+    def __len__(self):
+        return len(self._head) + self._spilled + len(self._tail)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def append(self, item):
+        url, depth = item
+        self._tail.urls.append(sys.intern(url))
+        self._tail.depths.append(depth)
+        if len(self._tail.urls) >= self.segment_items:
+            if self._head or self._segments:
+                self._spill()
+            else:
+                self._head, self._tail = self._tail, _Block()
+
+    def popleft(self):
+        if not self._head:
+            self._refill()
+        head = self._head
+        if not head:
+            raise IndexError("pop from an empty frontier")
+        i = head.pos
+        head.pos += 1
+        url, depth = head.urls[i], head.depths[i]
+        head.urls[i] = None
+        return url, depth
+
+    def close(self):
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self._segments.clear()
+        self._spilled = 0
+
+    # ── Segments ─────────────────────────────────────────────────
+    def _spill(self):
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="frontier-", dir=self.spill_dir)
+        path = os.path.join(self._dir, f"{self._next_segment:08d}.seg")
+        self._next_segment += 1
+        tail = self._tail
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"{depth}\t{url}\n" for url, depth in zip(tail.urls, tail.depths))
+        self._segments.append((path, len(tail.urls)))
+        self._spilled += len(tail.urls)
+        self._tail = _Block()
+
+    def _refill(self):
+        if self._segments:
+            path, count = self._segments.popleft()
+            block = _Block()
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    depth, url = line.rstrip("\n").split("\t", 1)
+                    block.urls.append(sys.intern(url))
+                    block.depths.append(int(depth))
+            os.remove(path)
+            self._spilled -= count
+            self._head = block
+        else:
+            self._head, self._tail = self._tail, _Block()
@@ -0,0 +1,353 @@
+# py_crawler/graph.py
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from array import array
+from urllib.parse import unquote, urlparse
+
+from py_crawler.canonical import canonicalize
+from py_crawler.db import get_db_path, iter_rows
+
+SNAPSHOT_MAGIC = b"PYCRAWLG1\n"
+UNREACHED = -1
+
+
+def to_wiki_path(value):
+    """Accept a title, a /wiki/ path or a full article URL and return the /wiki/ path."""
+    if value.startswith("http://") or value.startswith("https://"):
+        value = urlparse(value).path
+    if not value.startswith("/wiki/"):
+        value = "/wiki/" + value.replace(" ", "_")
+    return value
+
+
+class LinkGraph:
+    """Compressed (CSR) forward and reverse adjacency over integer node ids."""
+
+    def __init__(self, urls, fwd_off, fwd_dst, rev_off, rev_dst, landmarks=None):
+        self.urls = urls
+        self.ids = {url: i for i, url in enumerate(urls)}
+        self.fwd_off = fwd_off
+        self.fwd_dst = fwd_dst
+        self.rev_off = rev_off
+        self.rev_dst = rev_dst
+        # [(landmark id, dist from landmark, dist to landmark)]
+        self.landmarks = landmarks or []
+
+    @property
+    def node_count(self):
+        return len(self.urls)
+
+    @property
+    def edge_count(self):
+        return len(self.fwd_dst)
+
+    def out_neighbors(self, node):
+        return self.fwd_dst[self.fwd_off[node]:self.fwd_off[node + 1]]
+
+    def in_neighbors(self, node):
+        return self.rev_dst[self.rev_off[node]:self.rev_off[node + 1]]
+
+    def node_id(self, url):
+        # The DB stores canonical paths; older crawls may hold the raw or unquoted href
+        path = to_wiki_path(url)
+        for candidate in (canonicalize(path), path, unquote(path)):
+            node = self.ids.get(candidate)
+            if node is not None:
+                return node
+        return None
+
+    # ── Landmarks ────────────────────────────────────────────────
+    def _bfs_all(self, source, offsets, targets):
+        dist = array("i", [UNREACHED]) * self.node_count
+        dist[source] = 0
+        frontier = [source]
+        level = 0
+        while frontier:
+            level += 1
+            nxt = []
+            for u in frontier:
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if dist[v] == UNREACHED:
+                        dist[v] = level
+                        nxt.append(v)
+            frontier = nxt
+        return dist
+
+    def build_landmarks(self, count):
+        degree = [
+            (self.fwd_off[i + 1] - self.fwd_off[i]) + (self.rev_off[i + 1] - self.rev_off[i])
+            for i in range(self.node_count)
+        ]
+        chosen = sorted(range(self.node_count), key=degree.__getitem__, reverse=True)[:count]
+        self.landmarks = [
+            (lm, self._bfs_all(lm, self.fwd_off, self.fwd_dst), self._bfs_all(lm, self.rev_off, self.rev_dst))
+            for lm in chosen
+        ]
+
+    def landmark_bounds(self, s, t):
+        """Return (lower, upper) bounds on dist(s, t), or None if t is provably unreachable."""
+        lower, upper = 0, None
+        for _, dfrom, dto in self.landmarks:
+            ls, lt, sl, tl = dfrom[s], dfrom[t], dto[s], dto[t]
+            # s → t would give L → s → t and t → L ⇒ s → L
+            if (ls != UNREACHED and lt == UNREACHED) or (tl != UNREACHED and sl == UNREACHED):
+                return None
+            if ls != UNREACHED and lt != UNREACHED:
+                lower = max(lower, lt - ls)
+            if sl != UNREACHED and tl != UNREACHED:
+                lower = max(lower, sl - tl)
+            if sl != UNREACHED and lt != UNREACHED:
+                upper = sl + lt if upper is None else min(upper, sl + lt)
+        return lower, upper
+
+    def _lower_bound(self, v, t):
+        lower = 0
+        for _, dfrom, dto in self.landmarks:
+            lv, lt, vl, tl = dfrom[v], dfrom[t], dto[v], dto[t]
+            if lv != UNREACHED and lt != UNREACHED:
+                lower = max(lower, lt - lv)
+            if vl != UNREACHED and tl != UNREACHED:
+                lower = max(lower, vl - tl)
+        return lower
+
+    # ── Queries ──────────────────────────────────────────────────
+    def shortest_path(self, s, t, max_hops=-1):
+        """Bidirectional BFS; returns the list of node ids from s to t, or None."""
+        if s == t:
+            return [s]
+
+        upper = None
+        if self.landmarks:
+            bounds = self.landmark_bounds(s, t)
+            if bounds is None:
+                return None
+            _, upper = bounds
+
+        parent_f = {s: None}
+        parent_b = {t: None}
+        frontier_f, frontier_b = [s], [t]
+        depth_f = depth_b = 0
+
+        while frontier_f and frontier_b:
+            if 0 <= max_hops <= depth_f + depth_b:
+                return None
+
+            # Expand the smaller side
+            forward = len(frontier_f) <= len(frontier_b)
+            if forward:
+                offsets, targets, parents, other = self.fwd_off, self.fwd_dst, parent_f, parent_b
+                frontier, depth = frontier_f, depth_f + 1
+            else:
+                offsets, targets, parents, other = self.rev_off, self.rev_dst, parent_b, parent_f
+                frontier, depth = frontier_b, depth_b + 1
+
+            nxt = []
+            meet = None
+            for u in frontier:
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if v in parents:
+                        continue
+                    if v in other:
+                        parents[v] = u
+                        meet = v
+                        break
+                    if upper is not None:
+                        # Landmark pruning: v cannot lie on a path shorter than the known upper bound
+                        bound = self._lower_bound(v, t) if forward else self._lower_bound(s, v)
+                        if depth + bound > upper:
+                            continue
+                    parents[v] = u
+                    nxt.append(v)
+                if meet is not None:
+                    break
+
+            if forward:
+                frontier_f, depth_f = nxt, depth
+            else:
+                frontier_b, depth_b = nxt, depth
+
+            if meet is not None:
+                return self._join(meet, parent_f, parent_b)
+
+        return None
+
+    @staticmethod
+    def _join(meet, parent_f, parent_b):
+        path = []
+        node = meet
+        while node is not None:
+            path.append(node)
+            node = parent_f[node]
+        path.reverse()
+        node = parent_b[meet]
+        while node is not None:
+            path.append(node)
+            node = parent_b[node]
+        return path
+
+    def neighborhood(self, source, hops, direction="out"):
+        """Yield (node, hop) for every node within `hops` of source, level by level."""
+        seen = {source}
+        frontier = [source]
+        yield source, 0
+        for hop in range(1, hops + 1):
+            nxt = []
+            for u in frontier:
+                if direction in ("out", "both"):
+                    for v in self.fwd_dst[self.fwd_off[u]:self.fwd_off[u + 1]]:
+                        if v not in seen:
+                            seen.add(v)
+                            nxt.append(v)
+                            yield v, hop
+                if direction in ("in", "both"):
+                    for v in self.rev_dst[self.rev_off[u]:self.rev_off[u + 1]]:
+                        if v not in seen:
+                            seen.add(v)
+                            nxt.append(v)
+                            yield v, hop
+            if not nxt:
+                return
+            frontier = nxt
+
+
+# ── Loading ──────────────────────────────────────────────────────
+def _csr(n, src, dst):
+    offsets = array("q", [0]) * (n + 1)
+    for u in src:
+        offsets[u + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    cursor = array("q", offsets[:n])
+    targets = array("i", [0]) * len(dst)
+    for u, v in zip(src, dst):
+        targets[cursor[u]] = v
+        cursor[u] += 1
+    return offsets, targets
+
+
+def load_from_db(db_path=None, batch_size=50000):
+    ids = {}
+    urls = []
+    src = array("i")
+    dst = array("i")
+
+    def intern(url):
+        node = ids.get(url)
+        if node is None:
+            node = ids[url] = len(urls)
+            urls.append(url)
+        return node
+
+    with sqlite3.connect(db_path or get_db_path()) as conn:
+        for from_url, to_url in iter_rows("SELECT from_url, to_url FROM links", conn=conn, batch_rows=batch_size):
+            src.append(intern(from_url))
+            dst.append(intern(to_url))
+
+    fwd_off, fwd_dst = _csr(len(urls), src, dst)
+    rev_off, rev_dst = _csr(len(urls), dst, src)
+    return LinkGraph(urls, fwd_off, fwd_dst, rev_off, rev_dst)
+
+
+def save_snapshot(graph, path):
+    header = {
+        "nodes": graph.node_count,
+        "edges": graph.edge_count,
+        "landmarks": [lm for lm, _, _ in graph.landmarks],
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        for arr in (graph.fwd_off, graph.fwd_dst, graph.rev_off, graph.rev_dst):
+            arr.tofile(f)
+        for _, dfrom, dto in graph.landmarks:
+            dfrom.tofile(f)
+            dto.tofile(f)
+        f.write("\n".join(graph.urls).encode("utf-8"))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    with open(path, "rb") as f:
+        if f.readline() != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a link graph snapshot")
+        header = json.loads(f.readline())
+        n, m = header["nodes"], header["edges"]
+
+        def read(typecode, count):
+            arr = array(typecode)
+            arr.fromfile(f, count)
+            return arr
+
+        fwd_off, fwd_dst = read("q", n + 1), read("i", m)
+        rev_off, rev_dst = read("q", n + 1), read("i", m)
+        landmarks = [(lm, read("i", n), read("i", n)) for lm in header["landmarks"]]
+        blob = f.read().decode("utf-8")
+        urls = blob.split("\n") if n else []
+
+    return LinkGraph(urls, fwd_off, fwd_dst, rev_off, rev_dst, landmarks)
+
+
+def load_graph(snapshot=None, landmarks=0, rebuild=False, db_path=None):
+    """Load the link graph from a snapshot, rebuilding it from the DB when missing or stale."""
+    db_path = db_path or get_db_path()
+    if snapshot and not rebuild and os.path.exists(snapshot):
+        fresh = not os.path.exists(db_path) or os.path.getmtime(snapshot) >= os.path.getmtime(db_path)
+        if fresh:
+            graph = load_snapshot(snapshot)
+            if len(graph.landmarks) >= landmarks:
+                return graph
+
+    graph = load_from_db(db_path)
+    if landmarks:
+        graph.build_landmarks(landmarks)
+    if snapshot:
+        save_snapshot(graph, snapshot)
+    return graph
+
+
+# ── Commands ─────────────────────────────────────────────────────
+def _emit(obj, out):
+    out.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def find_path(from_url, to_url, snapshot=None, landmarks=0, max_hops=-1, out=sys.stdout):
+    graph = load_graph(snapshot, landmarks)
+
+    started = time.perf_counter()
+    s, t = graph.node_id(from_url), graph.node_id(to_url)
+    if s is None or t is None:
+        missing = from_url if s is None else to_url
+        _emit({"from": from_url, "to": to_url, "error": f"unknown page: {missing}"}, out)
+        return None
+
+    path = graph.shortest_path(s, t, max_hops)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _emit({
+        "from": graph.urls[s],
+        "to": graph.urls[t],
+        "hops": len(path) - 1 if path else None,
+        "path": [graph.urls[i] for i in path] if path else None,
+        "ms": round(elapsed_ms, 3),
+    }, out)
+    return path
+
+
+def find_neighborhood(url, hops=1, direction="out", snapshot=None, out=sys.stdout):
+    graph = load_graph(snapshot)
+
+    source = graph.node_id(url)
+    if source is None:
+        _emit({"url": url, "error": f"unknown page: {url}"}, out)
+        return 0
+
+    count = 0
+    for node, hop in graph.neighborhood(source, hops, direction):
+        _emit({"url": graph.urls[node], "hops": hop}, out)
+        count += 1
+    return count
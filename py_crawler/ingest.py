@@ -0,0 +1,310 @@
+# py_crawler/ingest.py
+
+import bz2
+import gzip
+import re
+import sqlite3
+import xml.etree.ElementTree as ET
+
+import py_crawler.db as db
+from py_crawler.canonical import is_valid_wiki_link, normalize_title, title_to_path
+from py_crawler.log import print_log
+
+# Rows per executemany() call and per staging transaction
+INGEST_BATCH_ROWS = 50000
+INGEST_COMMIT_ROWS = 1000000
+PROGRESS_EVERY = 1000000
+
+_SQL_TOKEN = re.compile(r"\(|\)|'((?:[^'\\]|\\.)*)'|(NULL)|(-?[0-9][0-9.eE+-]*)")
+_SQL_ESCAPE = re.compile(r"\\(.)")
+_SQL_ESCAPES = {"0": "\0", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a"}
+_CREATE_COLUMN = re.compile(r"^\s+`(\w+)`\s")
+_WIKILINK = re.compile(r"\[\[([^\[\]|#\n]+)(?:#[^\[\]|\n]*)?(?:\|[^\[\]]*)?\]\]")
+
+
+def open_dump(path):
+    """Open a plain, .gz or .bz2 dump as a text stream."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+# ── SQL dump parsing ─────────────────────────────────────────────
+def _unescape(value):
+    return _SQL_ESCAPE.sub(lambda m: _SQL_ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def iter_sql_rows(path):
+    """Yield each row of a mysqldump file as a dict keyed by column name.
+
+    Reads one INSERT statement (line) at a time, so memory stays bounded
+    by the longest statement rather than the size of the dump.
+    """
+    columns = []
+    in_create = False
+    with open_dump(path) as f:
+        for line in f:
+            if line.startswith("CREATE TABLE"):
+                columns, in_create = [], True
+                continue
+            if in_create:
+                match = _CREATE_COLUMN.match(line)
+                if match:
+                    columns.append(match.group(1))
+                elif line.startswith(")"):
+                    in_create = False
+                continue
+            if not line.startswith("INSERT INTO"):
+                continue
+
+            row = None
+            for match in _SQL_TOKEN.finditer(line, line.index(" VALUES ")):
+                token = match.group(0)
+                if token == "(":
+                    row = []
+                elif token == ")":
+                    if row is not None:
+                        yield dict(zip(columns, row))
+                    row = None
+                elif row is not None:
+                    string, null, number = match.groups()
+                    if string is not None:
+                        row.append(_unescape(string))
+                    elif null is not None:
+                        row.append(None)
+                    else:
+                        row.append(int(number) if number.lstrip("-").isdigit() else float(number))
+
+
+def _title_url(namespace, title):
+    if namespace != 0 or not title:
+        return None
+    url = title_to_path(title)
+    return url if is_valid_wiki_link(url) else None
+
+
+# ── XML dump parsing ─────────────────────────────────────────────
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_xml_pages(path):
+    """Yield (title, [linked titles]) for every non-redirect article in a pages XML dump."""
+    with open_dump(path) as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        page = {}
+        for event, elem in context:
+            if event != "end":
+                continue
+            tag = _local(elem.tag)
+            if tag in ("title", "ns", "text") and tag not in page:
+                page[tag] = elem.text or ""
+            elif tag == "redirect":
+                page["redirect"] = True
+            elif tag == "page":
+                if page.get("ns") == "0" and not page.get("redirect"):
+                    links = {normalize_title(m.group(1)) for m in _WIKILINK.finditer(page.get("text", ""))}
+                    yield page["title"], [t for t in links if t]
+                page = {}
+                # Drop everything parsed so far to keep memory flat
+                root.clear()
+
+
+# ── Staging and bulk load ────────────────────────────────────────
+def _open_staging(conn):
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA cache_size = -200000")
+    conn.execute("CREATE TEMP TABLE ingest_page (id INTEGER PRIMARY KEY, url TEXT)")
+    conn.execute("CREATE TEMP TABLE ingest_target (id INTEGER PRIMARY KEY, url TEXT)")
+    conn.execute("CREATE TEMP TABLE ingest_link (from_id INTEGER, to_url TEXT, target_id INTEGER)")
+
+
+def _bulk_insert(conn, sql, rows, label, log_file):
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INGEST_BATCH_ROWS:
+            conn.executemany(sql, batch)
+            total += len(batch)
+            batch.clear()
+            if total % INGEST_COMMIT_ROWS == 0:
+                conn.commit()
+            if total % PROGRESS_EVERY == 0:
+                print_log(f"  … staged {total:,} {label}", log_file)
+    if batch:
+        conn.executemany(sql, batch)
+        total += len(batch)
+    conn.commit()
+    print_log(f"📥 Staged {total:,} {label}", log_file)
+    return total
+
+
+def _finalize(conn, log_file):
+    """Move staged rows into pages/links with set-based inserts.
+
+    Rows are staged in unindexed temp tables and merged in primary-key
+    order, so SQLite builds the links index by appending instead of
+    doing one random B-tree insert per row.
+    """
+    print_log("🔗 Loading links", log_file)
+    cur = conn.execute("""
+        INSERT OR IGNORE INTO links (from_url, to_url)
+        SELECT p.url, COALESCE(l.to_url, t.url)
+        FROM ingest_link l
+        JOIN ingest_page p ON p.id = l.from_id
+        LEFT JOIN ingest_target t ON t.id = l.target_id
+        WHERE COALESCE(l.to_url, t.url) IS NOT NULL
+        ORDER BY 1, 2
+    """)
+    links = cur.rowcount
+
+    print_log("📄 Loading link targets", log_file)
+    conn.execute("""
+        INSERT OR IGNORE INTO pages (url, crawled)
+        SELECT DISTINCT COALESCE(l.to_url, t.url), 0
+        FROM ingest_link l
+        LEFT JOIN ingest_target t ON t.id = l.target_id
+        WHERE COALESCE(l.to_url, t.url) IS NOT NULL
+    """)
+
+    # A link target id missing from linktarget leaves its page's link list incomplete;
+    # such pages stay uncrawled so a live crawl still fetches them
+    conn.execute("""
+        CREATE TEMP TABLE ingest_unresolved AS
+        SELECT DISTINCT l.from_id AS id
+        FROM ingest_link l
+        LEFT JOIN ingest_target t ON t.id = l.target_id
+        WHERE l.target_id IS NOT NULL AND t.id IS NULL
+    """)
+    unresolved = conn.execute("SELECT COUNT(*) FROM ingest_unresolved").fetchone()[0]
+    if unresolved:
+        print_log(f"⚠️ {unresolved:,} pages link to ids missing from linktarget; leaving them uncrawled", log_file)
+        conn.execute("""
+            INSERT OR IGNORE INTO pages (url, crawled)
+            SELECT p.url, 0 FROM ingest_page p WHERE p.id IN (SELECT id FROM ingest_unresolved)
+        """)
+
+    print_log("✅ Marking ingested pages as crawled", log_file)
+    cur = conn.execute("""
+        INSERT INTO pages (url, crawled, out_links)
+        SELECT p.url, 1, (SELECT COUNT(*) FROM links l WHERE l.from_url = p.url)
+        FROM ingest_page p
+        WHERE p.id NOT IN (SELECT id FROM ingest_unresolved)
+        ON CONFLICT(url) DO UPDATE SET crawled = 1, out_links = excluded.out_links
+    """)
+    pages = cur.rowcount
+    conn.commit()
+    return pages, links
+
+
+def ingest_sql_dumps(page_path, pagelinks_path, linktarget_path=None, log_file="crawler.log"):
+    # Post-2024 pagelinks rows only hold a target id; without linktarget every link would be lost
+    rows = iter_sql_rows(pagelinks_path)
+    first = next(rows, {})
+    rows.close()
+    if "pl_target_id" in first and not linktarget_path:
+        print_log(f"❌ {pagelinks_path} uses the post-2024 schema (pl_target_id); pass --linktarget too.", log_file)
+        raise SystemExit(1)
+
+    db.create_tables()
+    with sqlite3.connect(db.get_db_path()) as conn:
+        _open_staging(conn)
+
+        print_log(f"📖 Reading page dump {page_path}", log_file)
+        _bulk_insert(
+            conn, "INSERT OR IGNORE INTO ingest_page (id, url) VALUES (?, ?)",
+            (
+                (row["page_id"], url)
+                for row in iter_sql_rows(page_path)
+                if not row.get("page_is_redirect")
+                for url in [_title_url(row["page_namespace"], row["page_title"])]
+                if url
+            ),
+            "pages", log_file
+        )
+
+        if linktarget_path:
+            print_log(f"📖 Reading linktarget dump {linktarget_path}", log_file)
+            _bulk_insert(
+                conn, "INSERT OR IGNORE INTO ingest_target (id, url) VALUES (?, ?)",
+                # Non-article targets are kept with a NULL url so their ids still count as resolved
+                (
+                    (row["lt_id"], _title_url(row["lt_namespace"], row["lt_title"]))
+                    for row in iter_sql_rows(linktarget_path)
+                ),
+                "link targets", log_file
+            )
+
+        print_log(f"📖 Reading pagelinks dump {pagelinks_path}", log_file)
+
+        def link_rows():
+            for row in iter_sql_rows(pagelinks_path):
+                if row.get("pl_from_namespace", 0) != 0:
+                    continue
+                if "pl_target_id" in row:
+                    # Post-2024 schema: titles live in the linktarget table
+                    yield row["pl_from"], None, row["pl_target_id"]
+                else:
+                    url = _title_url(row["pl_namespace"], row["pl_title"])
+                    if url:
+                        yield row["pl_from"], url, None
+
+        _bulk_insert(
+            conn, "INSERT INTO ingest_link (from_id, to_url, target_id) VALUES (?, ?, ?)",
+            link_rows(), "links", log_file
+        )
+
+        pages, links = _finalize(conn, log_file)
+    print_log(f"🏁 Ingest complete: {pages:,} pages crawled, {links:,} new links", log_file)
+    return pages, links
+
+
+def ingest_xml_dump(xml_path, log_file="crawler.log"):
+    db.create_tables()
+    with sqlite3.connect(db.get_db_path()) as conn:
+        _open_staging(conn)
+        print_log(f"📖 Reading XML dump {xml_path}", log_file)
+
+        def rows():
+            # Pages are numbered as they stream past; links are staged alongside
+            page_id = 0
+            for title, linked in iter_xml_pages(xml_path):
+                url = _title_url(0, title)
+                if not url:
+                    continue
+                page_id += 1
+                yield "page", (page_id, url)
+                for target in linked:
+                    to_url = _title_url(0, target)
+                    if to_url:
+                        yield "link", (page_id, to_url, None)
+
+        page_batch, link_batch = [], []
+        staged_pages = staged_links = 0
+        for kind, row in rows():
+            if kind == "page":
+                page_batch.append(row)
+                staged_pages += 1
+                if staged_pages % PROGRESS_EVERY == 0:
+                    print_log(f"  … staged {staged_pages:,} pages", log_file)
+            else:
+                link_batch.append(row)
+                staged_links += 1
+            if len(link_batch) >= INGEST_BATCH_ROWS or len(page_batch) >= INGEST_BATCH_ROWS:
+                conn.executemany("INSERT INTO ingest_page (id, url) VALUES (?, ?)", page_batch)
+                conn.executemany("INSERT INTO ingest_link (from_id, to_url, target_id) VALUES (?, ?, ?)", link_batch)
+                page_batch.clear()
+                link_batch.clear()
+        conn.executemany("INSERT INTO ingest_page (id, url) VALUES (?, ?)", page_batch)
+        conn.executemany("INSERT INTO ingest_link (from_id, to_url, target_id) VALUES (?, ?, ?)", link_batch)
+        conn.commit()
+        print_log(f"📥 Staged {staged_pages:,} pages and {staged_links:,} links", log_file)
+
+        pages, links = _finalize(conn, log_file)
+    print_log(f"🏁 Ingest complete: {pages:,} pages crawled, {links:,} new links", log_file)
+    return pages, links
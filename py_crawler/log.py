@@ -0,0 +1,11 @@
+# py_crawler/log.py
+
+from datetime import datetime
+
+
+def print_log(message, log_file):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    line = f"[{timestamp}] {message}"
+    print(line)
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
@@ -0,0 +1,99 @@
+# py_crawler/merge.py
+
+import os
+import sqlite3
+
+import py_crawler.db as db
+from py_crawler.log import print_log
+
+# Source rows copied per transaction
+MERGE_CHUNK_ROWS = 500000
+
+
+def _merge_chunked(conn, table, insert_sql, log_file):
+    """Run insert_sql over src.<table> in rowid ranges, one transaction per range."""
+    low, high = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM src.{table}").fetchone()
+    if low is None:
+        return 0
+
+    changed = 0
+    start = low
+    while start <= high:
+        end = start + MERGE_CHUNK_ROWS - 1
+        cur = conn.execute(insert_sql, (start, end))
+        changed += max(cur.rowcount, 0)
+        conn.commit()
+        done = min(end, high) - low + 1
+        print_log(f"  … {table}: {done / (high - low + 1):6.1%} ({changed:,} rows changed)", log_file)
+        start = end + 1
+    return changed
+
+
+def merge_database(source_path, log_file="crawler.log"):
+    if not os.path.exists(source_path):
+        print_log(f"❌ No such database: {source_path}", log_file)
+        return None
+
+    with sqlite3.connect(db.get_db_path()) as conn:
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = -200000")
+        conn.execute("ATTACH DATABASE ? AS src", (source_path,))
+        try:
+            print_log(f"🔀 Merging {source_path}", log_file)
+            src_tables = {row[0] for row in conn.execute("SELECT name FROM src.sqlite_master WHERE type = 'table'")}
+
+            pages = 0
+            if "pages" in src_tables:
+                cols = db.page_columns(conn, "src")
+                word_count = "word_count" if "word_count" in cols else "NULL"
+                out_links = "out_links" if "out_links" in cols else "NULL"
+                title = "title" if "title" in cols else "NULL"
+                # Metrics move as a pair from one crawl: the later source's row, when it has any
+                newer = "excluded.word_count IS NOT NULL OR excluded.out_links IS NOT NULL"
+                pages = _merge_chunked(conn, "pages", f"""
+                    INSERT INTO pages (url, crawled, word_count, out_links, title)
+                    SELECT url, COALESCE(crawled, 0), {word_count}, {out_links}, {title}
+                    FROM src.pages
+                    WHERE rowid BETWEEN ? AND ?
+                    ORDER BY url
+                    ON CONFLICT(url) DO UPDATE SET
+                        crawled = MAX(crawled, excluded.crawled),
+                        word_count = CASE WHEN {newer} THEN excluded.word_count ELSE word_count END,
+                        out_links = CASE WHEN {newer} THEN excluded.out_links ELSE out_links END,
+                        title = COALESCE(title, excluded.title)
+                """, log_file)
+
+            links = 0
+            if "links" in src_tables:
+                links = _merge_chunked(conn, "links", """
+                    INSERT OR IGNORE INTO links (from_url, to_url)
+                    SELECT from_url, to_url
+                    FROM src.links
+                    WHERE rowid BETWEEN ? AND ?
+                    ORDER BY from_url, to_url
+                """, log_file)
+
+            if "aliases" in src_tables:
+                conn.execute("INSERT OR IGNORE INTO aliases (alias, canonical) SELECT alias, canonical FROM src.aliases")
+                conn.commit()
+
+            if "categories" in src_tables:
+                conn.execute("INSERT OR IGNORE INTO categories (url, category) SELECT url, category FROM src.categories")
+                conn.commit()
+        finally:
+            conn.commit()
+            conn.execute("DETACH DATABASE src")
+
+    print_log(f"✅ Merged {source_path}: {pages:,} page rows upserted, {links:,} new links", log_file)
+    return pages, links
+
+
+def merge_databases(source_paths, log_file="crawler.log"):
+    """Merge each source into the current DB in order; later sources' page metrics win."""
+    db.create_tables()
+    target = os.path.abspath(db.get_db_path())
+    for path in source_paths:
+        if os.path.abspath(path) == target:
+            print_log(f"⚠️ Skipping {path}: it is the target database", log_file)
+            continue
+        merge_database(path, log_file)
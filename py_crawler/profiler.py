@@ -0,0 +1,236 @@
+# py_crawler/profiler.py
+
+import cProfile
+import functools
+import importlib
+import inspect
+import sys
+import threading
+import time
+from collections import defaultdict
+
+# Hot-path functions timed by --profile: (module, attribute, stage name).
+# Every public function in py_crawler.db is added on top of these as "db.<name>".
+HOT_PATHS = [
+    ("py_crawler.wiki_crawler", "fetch_links", "fetch_links"),
+    ("py_crawler.wiki_crawler", "fetch_links_api", "fetch_links_api"),
+    ("py_crawler.wiki_crawler", "extract_stream", "extract_stream"),
+    ("py_crawler.wiki_crawler", "matches_topic", "matches_topic"),
+    ("py_crawler.log", "print_log", "print_log"),
+]
+DB_MODULE = "py_crawler.db"
+
+_active = None
+
+
+class Profiler:
+    """Per-stage wall/CPU timers, plus optional cProfile and stack sampling.
+
+    Nothing is touched until enable() is called: the hot-path functions are
+    swapped for timed wrappers only while a profile is running, so a normal
+    run pays no overhead at all.
+    """
+
+    def __init__(self, prefix, root="main", use_cprofile=False, sample_hz=0):
+        self.prefix = prefix
+        self.root = root
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+
+        # name -> [calls, wall, cpu, self wall]
+        self.stages = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        # "root;stage;stage" -> self wall seconds
+        self.folded = defaultdict(float)
+        self.patched = []
+
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+        self.sample_hz = sample_hz
+        self.samples = defaultdict(int)
+        self._sampling = False
+        self._sampler = None
+
+    # ── Timing ────────────────────────────────────────────────────
+    def _stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = [self.root if threading.current_thread() is threading.main_thread()
+                                        else f"{self.root}-worker"]
+        return stack
+
+    def call(self, name, fn, args, kwargs):
+        stack = self._stack()
+        stack.append(name)
+        children = getattr(self.local, "children", None)
+        if children is None:
+            children = self.local.children = []
+        children.append(0.0)
+
+        w0 = time.perf_counter()
+        c0 = time.thread_time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            wall = time.perf_counter() - w0
+            cpu = time.thread_time() - c0
+            path = ";".join(stack)
+            stack.pop()
+            child_wall = children.pop()
+            if children:
+                children[-1] += wall
+            with self.lock:
+                entry = self.stages[name]
+                entry[0] += 1
+                entry[1] += wall
+                entry[2] += cpu
+                entry[3] += wall - child_wall
+                self.folded[path] += wall - child_wall
+
+    # ── Instrumentation ───────────────────────────────────────────
+    def _targets(self):
+        targets = []
+        for module_name, attr, stage in HOT_PATHS:
+            module = importlib.import_module(module_name)
+            targets.append((getattr(module, attr), stage))
+
+        db = importlib.import_module(DB_MODULE)
+        for name, fn in inspect.getmembers(db, inspect.isfunction):
+            if fn.__module__ == DB_MODULE and not name.startswith("_"):
+                targets.append((fn, f"db.{name}"))
+        return targets
+
+    def instrument(self):
+        for original, stage in self._targets():
+            wrapper = _timed(stage, original)
+            # Rebind every reference, including ones made with `from x import y`
+            for module_name, module in list(sys.modules.items()):
+                if not module_name.startswith("py_crawler") or module is None:
+                    continue
+                for attr, value in list(vars(module).items()):
+                    if value is original:
+                        setattr(module, attr, wrapper)
+                        self.patched.append((module, attr, original))
+
+    def restore(self):
+        for module, attr, original in reversed(self.patched):
+            setattr(module, attr, original)
+        self.patched.clear()
+
+    # ── Sampling ──────────────────────────────────────────────────
+    def _sample_loop(self):
+        interval = 1.0 / self.sample_hz
+        me = threading.get_ident()
+        names = {}
+        while self._sampling:
+            time.sleep(interval)
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(frames))] += 1
+
+    def start(self):
+        self.instrument()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        if self.sample_hz > 0:
+            self._sampling = True
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if self._sampler is not None:
+            self._sampling = False
+            self._sampler.join()
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self.restore()
+
+    # ── Reporting ─────────────────────────────────────────────────
+    def report_lines(self):
+        total_wall = time.perf_counter() - self.start_wall
+        total_cpu = time.process_time() - self.start_cpu
+        lines = [
+            f"Profile: {self.root}",
+            f"Total wall: {total_wall:.3f}s   Total CPU: {total_cpu:.3f}s",
+            "",
+            f"{'stage':<28}{'calls':>9}{'wall s':>11}{'self s':>11}{'cpu s':>11}{'mean ms':>10}",
+        ]
+        ranked = sorted(self.stages.items(), key=lambda kv: kv[1][1], reverse=True)
+        for name, (calls, wall, cpu, self_wall) in ranked:
+            mean_ms = wall / calls * 1000 if calls else 0.0
+            lines.append(f"{name:<28}{calls:>9}{wall:>11.3f}{self_wall:>11.3f}{cpu:>11.3f}{mean_ms:>10.2f}")
+        return lines
+
+    def write(self):
+        written = []
+
+        report_path = f"{self.prefix}.txt"
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.report_lines()) + "\n")
+        written.append(report_path)
+
+        folded_path = f"{self.prefix}.folded"
+        _write_folded(folded_path, {k: int(v * 1_000_000) for k, v in self.folded.items()})
+        written.append(folded_path)
+
+        if self.cprofile is not None:
+            prof_path = f"{self.prefix}.prof"
+            self.cprofile.dump_stats(prof_path)
+            written.append(prof_path)
+
+        if self.samples:
+            sampled_path = f"{self.prefix}.sampled.folded"
+            _write_folded(sampled_path, self.samples)
+            written.append(sampled_path)
+
+        return written
+
+
+def _write_folded(path, counts):
+    # Brendan Gregg collapsed-stack format: "frame;frame;frame count"
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in sorted(counts.items()):
+            if count > 0:
+                f.write(f"{stack} {count}\n")
+
+
+def _timed(stage, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        prof = _active
+        if prof is None:
+            return fn(*args, **kwargs)
+        return prof.call(stage, fn, args, kwargs)
+    return wrapper
+
+
+def enable(prefix, root="main", use_cprofile=False, sample_hz=0):
+    global _active
+    if _active is not None:
+        return _active
+    prof = Profiler(prefix, root=root, use_cprofile=use_cprofile, sample_hz=sample_hz)
+    prof.start()
+    _active = prof
+    return prof
+
+
+def finish():
+    global _active
+    prof = _active
+    if prof is None:
+        return []
+    _active = None
+    prof.stop()
+    written = prof.write()
+    print("\n".join(prof.report_lines()))
+    print(f"⏱️ Profile written to: {', '.join(written)}")
+    return written
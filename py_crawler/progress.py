@@ -8,7 +8,7 @@ from threading import Thread, Lock
 
 
 class CrawlStats:
-    def __init__(self, topics=None, max_depth=None):
+    def __init__(self, topics=None, max_depth=None, live=True):
         self.console = Console()
         self.lock = Lock()
         self.start_time = time()
@@ -20,10 +20,14 @@ class CrawlStats:
         self.max_depth = max_depth or 0
         self.retries = 0
         self.topics = topics or []
+        # Runtime settings (workers, state, ...) shown as extra rows
+        self.settings = {}
 
         self._running = True
-        self._thread = Thread(target=self._live_render_loop, daemon=True)
-        self._thread.start()
+        self._thread = None
+        if live:
+            self._thread = Thread(target=self._live_render_loop, daemon=True)
+            self._thread.start()
 
     def _render_table(self):
         with self.lock:
@@ -42,6 +46,8 @@ class CrawlStats:
             table.add_row("Retries", str(self.retries))
             table.add_row("Elapsed Time", f"{mins}m {secs}s")
             table.add_row("Topic Filter", ", ".join(self.topics) if self.topics else "None")
+            for name, value in self.settings.items():
+                table.add_row(name.replace("_", " ").title(), str(value))
 
             return table
 
@@ -51,15 +57,35 @@ class CrawlStats:
                 sleep(1)
                 live.update(self._render_table())
 
-    def update(self, *, crawled=0, queued=0, failed=0, retries=0, depth=None):
+    def update(self, *, crawled=0, queued=None, failed=0, retries=0, depth=None):
         with self.lock:
             self.pages_crawled += crawled
-            self.pages_queued = queued
+            if queued is not None:
+                self.pages_queued = queued
             self.pages_failed += failed
             self.retries += retries
             if depth is not None:
                 self.current_depth = max(self.current_depth, depth)
 
+    def report(self, **settings):
+        with self.lock:
+            self.settings.update(settings)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "pages_crawled": self.pages_crawled,
+                "pages_queued": self.pages_queued,
+                "pages_failed": self.pages_failed,
+                "current_depth": self.current_depth,
+                "max_depth": self.max_depth,
+                "retries": self.retries,
+                "elapsed_seconds": round(time() - self.start_time, 1),
+                "topics": list(self.topics),
+                **self.settings,
+            }
+
     def stop(self):
         self._running = False
-        self._thread.join()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,279 @@
+# py_crawler/serve.py
+
+import fcntl
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import py_crawler.db as db
+from .config import (
+    DEFAULT_START_PATH, FETCH_BACKEND, API_URL, FRONTIER_MEMORY_ITEMS, MAX_WORKERS,
+    SERVE_WINDOW_SECONDS, SERVE_PAGES_PER_WINDOW, WORKERS_LIMIT
+)
+from py_crawler.log import print_log
+
+# The crawler itself (requests, rich, ...) is imported by serve() only, so
+# `ctl` and the lock used by `crawl` stay cheap to import.
+
+
+def pidfile_path(db_path):
+    return db_path + ".pid"
+
+
+def socket_path(db_path):
+    return db_path + ".sock"
+
+
+# ── One crawler per DB ───────────────────────────────────────────
+@contextmanager
+def crawler_lock(db_path, log_file):
+    """Hold an exclusive flock on <db>.pid for the life of the crawler.
+
+    The kernel drops the lock when the process dies, so a leftover pidfile
+    never blocks the next run; the file is truncated, not removed, to avoid
+    racing a crawler that is opening it.
+    """
+    f = open(pidfile_path(db_path), "a+")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.seek(0)
+        owner = f.read().strip() or "?"
+        f.close()
+        print_log(f"❌ Another crawler (pid {owner}) is already running on {db_path}", log_file)
+        raise SystemExit(1)
+
+    try:
+        f.seek(0)
+        f.truncate()
+        f.write(f"{os.getpid()}\n")
+        f.flush()
+        yield
+    finally:
+        f.truncate(0)
+        f.close()
+
+
+# ── Runtime control ──────────────────────────────────────────────
+class CrawlControl:
+    """Knobs shared by the crawl loop and the control socket.
+
+    The crawl loop calls checkpoint() at every batch boundary and re-reads
+    workers and topics there, so changes apply from the next batch on.
+    """
+
+    def __init__(self, workers, topics, stats, workers_limit=WORKERS_LIMIT):
+        self.workers = workers
+        self.workers_limit = workers_limit
+        self.topics = topics
+        self.stats = stats
+        self.window_ends = time.monotonic()
+        self.window_start_crawled = 0
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._stopped = threading.Event()
+        stats.report(workers=workers, state="running")
+
+    @property
+    def paused(self):
+        return not self._resumed.is_set()
+
+    @property
+    def stopping(self):
+        return self._stopped.is_set()
+
+    def checkpoint(self):
+        """Block while paused; False once a stop was requested."""
+        self._resumed.wait()
+        return not self.stopping
+
+    def sleep(self, seconds):
+        self._stopped.wait(max(0, seconds))
+
+    def start_window(self, seconds):
+        self.window_ends = time.monotonic() + seconds
+        self.window_start_crawled = self.stats.pages_crawled
+
+    def pause(self):
+        self._resumed.clear()
+        self.stats.report(state="paused")
+
+    def resume(self):
+        self._resumed.set()
+        self.stats.report(state="running")
+
+    def stop(self):
+        self._stopped.set()
+        self._resumed.set()
+        self.stats.report(state="stopping")
+
+    def set_workers(self, workers):
+        self.workers = max(1, min(int(workers), self.workers_limit))
+        self.stats.report(workers=self.workers)
+
+    def set_topics(self, topics):
+        if isinstance(topics, str):
+            topics = topics.split(",")
+        self.topics = [t.strip().lower() for t in topics if t.strip()]
+        self.stats.topics = self.topics
+
+    def snapshot(self):
+        snap = self.stats.snapshot()
+        snap["pid"] = os.getpid()
+        snap["window_crawled"] = snap["pages_crawled"] - self.window_start_crawled
+        snap["window_remaining_seconds"] = round(max(0, self.window_ends - time.monotonic()), 1)
+        return snap
+
+    def handle(self, request):
+        cmd = request.get("cmd")
+        if cmd == "pause":
+            self.pause()
+        elif cmd == "resume":
+            self.resume()
+        elif cmd == "stop":
+            self.stop()
+        elif cmd == "workers":
+            self.set_workers(request["value"])
+        elif cmd == "topics":
+            self.set_topics(request["value"])
+        elif cmd != "stats":
+            return {"ok": False, "error": f"unknown command {cmd!r}"}
+        return {"ok": True, "stats": self.snapshot()}
+
+
+# ── Control socket ───────────────────────────────────────────────
+class _ControlHandler(socketserver.StreamRequestHandler):
+    # One JSON object per line in, one JSON reply per line out
+    def handle(self):
+        for line in self.rfile:
+            try:
+                reply = self.server.control.handle(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+
+class ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, control):
+        self.control = control
+        super().__init__(path, _ControlHandler)
+
+
+def start_control_server(path, control):
+    # We hold the DB lock, so any socket file left here belongs to a dead crawler
+    if os.path.exists(path):
+        os.remove(path)
+    server = ControlServer(path, control)
+    os.chmod(path, 0o600)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def send_command(path, cmd, value=None):
+    request = {"cmd": cmd}
+    if value is not None:
+        request["value"] = value
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(path)
+        sock.sendall((json.dumps(request) + "\n").encode())
+        with sock.makefile("r", encoding="utf-8") as f:
+            return json.loads(f.readline())
+
+
+# ── Daemon loop ──────────────────────────────────────────────────
+def next_seed(topics):
+    """An uncrawled page to restart BFS from, or None once there is none left."""
+    seed = db.get_next_uncrawled(topics)
+    if seed is None and not db.is_crawled(DEFAULT_START_PATH):
+        seed = DEFAULT_START_PATH
+    return seed
+
+
+def serve(log_file, topics, max_depth, workers=MAX_WORKERS, backend=FETCH_BACKEND, api_url=API_URL,
+          frontier_items=FRONTIER_MEMORY_ITEMS, frontier_dir=None, window_seconds=SERVE_WINDOW_SECONDS,
+          pages_per_window=SERVE_PAGES_PER_WINDOW, sock_path=None, dashboard=False, tuner=None):
+    """Crawl continuously, at most pages_per_window pages per window_seconds.
+
+    Worker threads, their HTTP sessions, the alias cache, the stats, the BFS
+    frontier and the autotuner's converged worker count all live for the
+    whole process instead of being rebuilt by every cron run; a new seed is
+    only taken from the DB once the frontier drains.
+    """
+    from py_crawler.frontier import SpillingFrontier
+    from py_crawler.progress import CrawlStats
+    from py_crawler.wiki_crawler import crawl_bfs_threaded
+
+    db_path = db.get_db_path()
+    sock_path = sock_path or socket_path(db_path)
+
+    with crawler_lock(db_path, log_file):
+        db.create_tables()
+        stats = CrawlStats(topics, max_depth, live=dashboard)
+        # Sized for the largest worker count; threads are only spawned as batches need them
+        pool_size = max(WORKERS_LIMIT, tuner.max_workers) if tuner else WORKERS_LIMIT
+        control = CrawlControl(workers, topics, stats, workers_limit=pool_size)
+        server = start_control_server(sock_path, control)
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: control.stop())
+
+        print_log(f"🛰️ Crawler serving {db_path} (pid {os.getpid()}, control socket {sock_path})", log_file)
+        frontier = SpillingFrontier(max_items=frontier_items, spill_dir=frontier_dir)
+        try:
+            with ThreadPoolExecutor(max_workers=pool_size) as executor:
+                while not control.stopping:
+                    control.start_window(window_seconds)
+                    budget = pages_per_window
+                    while budget > 0 and control.checkpoint():
+                        # Continue the existing BFS; re-seed (at depth 0) only when it has run dry
+                        start_path = None
+                        if not frontier:
+                            start_path = next_seed(control.topics)
+                            if start_path is None:
+                                print_log("🏁 No uncrawled pages left; waiting for the next window", log_file)
+                                break
+                        crawled = crawl_bfs_threaded(
+                            start_path=start_path,
+                            max_pages=budget,
+                            log_file=log_file,
+                            topics=control.topics,
+                            max_depth=max_depth,
+                            max_workers=control.workers,
+                            backend=backend,
+                            api_url=api_url,
+                            frontier_items=frontier_items,
+                            frontier_dir=frontier_dir,
+                            control=control,
+                            stats=stats,
+                            executor=executor,
+                            tuner=tuner,
+                            frontier=frontier
+                        )
+                        if not crawled:
+                            if start_path is None and not frontier:
+                                continue  # the queue only held crawled or too-deep pages
+                            break
+                        budget -= crawled
+
+                    if control.stopping:
+                        break
+                    done = stats.pages_crawled - control.window_start_crawled
+                    wait = control.window_ends - time.monotonic()
+                    print_log(f"💤 Window done: {done} pages crawled, next window in {max(0, wait):.0f}s", log_file)
+                    control.sleep(wait)
+        finally:
+            frontier.close()
+            server.shutdown()
+            server.server_close()
+            if os.path.exists(sock_path):
+                os.remove(sock_path)
+            stats.stop()
+            print_log("✅ Crawler daemon stopped.", log_file)
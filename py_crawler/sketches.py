@@ -0,0 +1,216 @@
+# py_crawler/sketches.py
+
+import heapq
+import math
+import random
+from array import array
+
+# Streaming summaries with fixed memory, for one-pass stats over huge link
+# tables. Items are hashed with Python's hash(), which is salted per process:
+# results are stable within a run but may differ slightly between runs.
+
+MASK64 = (1 << 64) - 1
+
+
+def hash64(item):
+    return hash(item) & MASK64
+
+
+class HyperLogLog:
+    """Distinct-count estimate in 2**precision one-byte registers.
+
+    Relative standard error is 1.04 / sqrt(2**precision), e.g. 0.81% at
+    precision 14 (16 KiB).
+    """
+
+    def __init__(self, precision=14):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self._rest_bits = 64 - precision
+        self._rest_mask = (1 << self._rest_bits) - 1
+
+    def add_hash(self, h):
+        i = h >> self._rest_bits
+        # Position of the leftmost 1-bit in the remaining bits
+        rank = self._rest_bits - (h & self._rest_mask).bit_length() + 1
+        if rank > self.registers[i]:
+            self.registers[i] = rank
+
+    def add(self, item):
+        self.add_hash(hash64(item))
+
+    def merge(self, other):
+        merged = HyperLogLog(self.p)
+        merged.registers = bytearray(map(max, self.registers, other.registers))
+        return merged
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are empty
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+class CountMinSketch:
+    """Frequency estimates that never undercount.
+
+    With width ceil(e / epsilon) and depth ceil(ln(1 / delta)), every
+    estimate is at most true + epsilon * total with probability 1 - delta.
+    Uses conservative update, which keeps that bound and tightens it in
+    practice.
+    """
+
+    def __init__(self, epsilon=0.0005, delta=0.01):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = array("q", bytes(8 * self.width * self.depth))
+        self.total = 0
+        self._rows = [(row, row * self.width) for row in range(self.depth)]
+
+    def _cells(self, h):
+        # Kirsch–Mitzenmacher: depth indexes from two halves of one 64-bit hash
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        width = self.width
+        return [offset + (h1 + row * h2) % width for row, offset in self._rows]
+
+    def add_hash(self, h, count=1):
+        """Add count occurrences; returns the item's new estimate."""
+        table = self.table
+        cells = self._cells(h)
+        values = [table[c] for c in cells]
+        estimate = min(values) + count
+        for c, value in zip(cells, values):
+            if value < estimate:
+                table[c] = estimate
+        self.total += count
+        return estimate
+
+    def estimate_hash(self, h):
+        return min(self.table[c] for c in self._cells(h))
+
+    @property
+    def error_bound(self):
+        return math.ceil(self.epsilon * self.total)
+
+
+class TopK:
+    """The k largest (count, item) pairs seen, for counts that only grow.
+
+    Re-offering an item with a higher count replaces its old entry, so it can
+    track running Count-Min estimates (heavy hitters) as well as final exact
+    counts.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.counts = {}
+        self._heap = []
+        # Smallest kept count as of the last eviction; only ever rises, so a
+        # count at or below it can be rejected without touching the heap
+        self.floor = 0
+
+    def offer(self, item, count):
+        counts = self.counts
+        if item in counts:
+            counts[item] = count
+            heapq.heappush(self._heap, (count, item))
+        elif len(counts) < self.k:
+            counts[item] = count
+            heapq.heappush(self._heap, (count, item))
+        elif count > self.floor and count > self._floor():
+            _, evicted = heapq.heappop(self._heap)
+            del counts[evicted]
+            counts[item] = count
+            heapq.heappush(self._heap, (count, item))
+        if len(self._heap) > 8 * self.k:
+            self._heap = [(c, i) for i, c in counts.items()]
+            heapq.heapify(self._heap)
+
+    def _floor(self):
+        # Drop heap entries made stale by later offers of the same item
+        heap, counts = self._heap, self.counts
+        while heap[0][0] != counts.get(heap[0][1]):
+            heapq.heappop(heap)
+        self.floor = heap[0][0]
+        return self.floor
+
+    def items(self):
+        return sorted(self.counts.items(), key=lambda x: x[1], reverse=True)
+
+
+class Reservoir:
+    """Uniform sample of up to `size` values from a stream (Algorithm R)."""
+
+    def __init__(self, size=10000, seed=None):
+        self.size = size
+        self.seen = 0
+        self.sample = []
+        self._random = random.Random(seed)
+
+    def add(self, value):
+        self.seen += 1
+        if len(self.sample) < self.size:
+            self.sample.append(value)
+        else:
+            j = self._random.randrange(self.seen)
+            if j < self.size:
+                self.sample[j] = value
+
+
+class DistinctSample:
+    """Uniform sample of distinct items with their exact occurrence counts.
+
+    Keeps the `size` items with the smallest hashes (bottom-k). The cut-off
+    only ever drops, so a kept item has been counted since its first
+    occurrence.
+    """
+
+    def __init__(self, size=10000):
+        self.size = size
+        self.counts = {}
+        self._heap = []  # max-heap of (-hash, item) for the kept items
+        self.threshold = MASK64  # hashes above this are never kept
+
+    def add_hash(self, h, item):
+        if h > self.threshold:
+            return
+        counts = self.counts
+        if item in counts:
+            counts[item] += 1
+            return
+        counts[item] = 1
+        heapq.heappush(self._heap, (-h, item))
+        if len(self._heap) > self.size:
+            _, evicted = heapq.heappop(self._heap)
+            del counts[evicted]
+        if len(self._heap) == self.size:
+            self.threshold = -self._heap[0][0]
+
+    @property
+    def sample(self):
+        return list(self.counts.values())
+
+
+def quantiles(values, qs=(0.5, 0.9, 0.99)):
+    ordered = sorted(values)
+    if not ordered:
+        return [0 for _ in qs]
+    return [ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in qs]
+
+
+def quantile_rank_error(n, confidence=0.95):
+    """DKW bound: the sample CDF is within this of the true CDF at `confidence`."""
+    if not n:
+        return 1.0
+    return math.sqrt(math.log(2 / (1 - confidence)) / (2 * n))
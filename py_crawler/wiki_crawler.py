@@ -2,28 +2,49 @@ import requests
 import time
 import random
 import argparse
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-from collections import deque
+import threading
+from urllib.parse import urljoin, urlparse
+from collections import deque, defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
 
 from .config import (
     BASE_URL, DEFAULT_START_PATH, MAX_WORKERS, MAX_DEPTH, MAX_CHILDREN,
-    SLEEP_TIME, RETRY_ATTEMPTS
+    SLEEP_TIME, RETRY_ATTEMPTS, FETCH_BACKEND, API_URL, API_BATCH_SIZE, USER_AGENT,
+    FRONTIER_MEMORY_ITEMS, FETCH_CHUNK_BYTES, MAX_BODY_BYTES, STOP_AFTER_CONTENT, FETCH_DRAIN_BYTES
 )
 import py_crawler.db as db
+from py_crawler.canonical import aliases, canonicalize, is_valid_wiki_link, title_to_path, path_to_title
+from py_crawler.extract import PageFeatures, extract_stream
+from py_crawler.frontier import SpillingFrontier
+from py_crawler.log import print_log
 from py_crawler.progress import CrawlStats
 
-def print_log(message, log_file):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    line = f"[{timestamp}] {message}"
-    print(line)
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(line + "\n")
+# Fetch outcomes, the last element of every (url, links, features, status) result
+FETCH_OK = "ok"
+FETCH_MISSING = "missing"  # the page does not exist; final, never retried
+FETCH_FAILED = "failed"    # worth retrying
+FETCH_OVERLOADED = "overloaded"  # timeout, 429 or 5xx: retried, and tells the autotuner to back off
 
-def is_valid_wiki_link(href):
-    return href.startswith("/wiki/") and ':' not in href and '#' not in href
+# MediaWiki API error codes that mean "slow down"
+API_OVERLOAD_ERRORS = {"ratelimited", "maxlag"}
+
+
+class ApiError(RuntimeError):
+    def __init__(self, error):
+        super().__init__(error.get("info", error))
+        self.code = error.get("code")
+
+
+def _failure_status(exc):
+    """FETCH_OVERLOADED for errors caused by load on the server, else FETCH_FAILED."""
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+        return FETCH_OVERLOADED
+    if isinstance(exc, ApiError) and exc.code in API_OVERLOAD_ERRORS:
+        return FETCH_OVERLOADED
+    response = getattr(exc, "response", None)
+    if response is not None and (response.status_code == 429 or response.status_code >= 500):
+        return FETCH_OVERLOADED
+    return FETCH_FAILED
 
 def matches_topic(href, text, topics):
     if not topics:
@@ -32,67 +53,259 @@ def matches_topic(href, text, topics):
     text_lower = text.lower()
     return any(topic in href_lower or topic in text_lower for topic in topics)
 
+# ── HTTP sessions ────────────────────────────────────────────────
+_local = threading.local()
+
+def _session():
+    # One keep-alive session per worker thread; reused for as long as the thread lives
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+        session.headers["User-Agent"] = USER_AGENT
+    return session
+
 def fetch_links(url, log_file, topics):
     full_url = urljoin(BASE_URL, url)
     print_log(f"→ Fetching: {full_url}", log_file)
     try:
-        resp = requests.get(full_url, timeout=10)
-        resp.raise_for_status()
+        with _session().get(full_url, timeout=10, stream=True) as resp:
+            if resp.status_code in (404, 410):
+                print_log(f"  🚫 No such page: {full_url}", log_file)
+                return url, [], None, FETCH_MISSING
+            resp.raise_for_status()
+            # One pass over the streamed body yields links, word count, title,
+            # categories and the canonical URL, one chunk in memory at a time
+            chunks = resp.iter_content(FETCH_CHUNK_BYTES)
+            page, size, truncated = extract_stream(
+                chunks, resp.encoding or "utf-8", MAX_BODY_BYTES, STOP_AFTER_CONTENT
+            )
+            if not truncated:
+                # A short unread tail is cheaper to drain than a new TLS connection
+                drained = 0
+                for chunk in chunks:
+                    drained += len(chunk)
+                    if drained > FETCH_DRAIN_BYTES:
+                        break
     except Exception as e:
         print_log(f"  ⚠️ Failed to fetch {full_url}: {e}", log_file)
-        return url, [], 0, False
+        return url, [], None, _failure_status(e)
 
-    soup = BeautifulSoup(resp.text, 'html.parser')
+    if truncated:
+        print_log(f"  ✂️ Truncated {full_url} at {size:,} bytes", log_file)
 
-    # Rough article word count: main content text only
-    content_root = soup.find(id="mw-content-text")
-    text = content_root.get_text(separator=" ", strip=True) if content_root else soup.get_text(" ", strip=True)
-    word_count = len([w for w in text.split() if w.isalpha()])
+    # Wikipedia serves redirects in place; the canonical link names the real article
+    landed = page.canonical or urlparse(resp.url).path
+    if landed.startswith("/wiki/"):
+        aliases.record(url, landed)
 
+    # Canonicalize before validating so section links (/wiki/Foo#History) count as /wiki/Foo
     all_links = {
-        (a['href'], a.get_text(strip=True))
-        for a in soup.find_all('a', href=True)
-        if is_valid_wiki_link(a['href'])
+        (href, text)
+        for raw, text in page.anchors
+        if raw.startswith("/wiki/")
+        for href in [canonicalize(raw)]
+        if is_valid_wiki_link(href)
     }
 
-    filtered = [
+    filtered = list(dict.fromkeys(
         href
         for href, text in all_links
         if matches_topic(href, text, topics)
-    ]
+    ))
     sampled = filtered if MAX_CHILDREN == -1 else random.sample(filtered, min(MAX_CHILDREN, len(filtered)))
-    return url, sampled, word_count, True
+    features = page.features(out_links=len({href for href, _ in all_links}))
+    return url, sampled, features, FETCH_OK
+
+
+# ── MediaWiki Action API backend ─────────────────────────────────
+def fetch_links_api(urls, log_file, topics, api_url=API_URL):
+    """Fetch outgoing article links for up to API_BATCH_SIZE pages in one query.
+
+    Returns one (url, links, features, status) tuple per input url, in order,
+    with links mapped back to /wiki/ paths and filtered like fetch_links.
+    The API has no cheap word count, so features.word_count is None.
 
+    prop=links also lists red links, which the HTML backend never sees; they
+    come back FETCH_MISSING when crawled and are not tried again.
+    """
+    print_log(f"→ Fetching {len(urls)} pages via API: {api_url}", log_file)
+
+    # resolved title -> requested titles (follows normalization and redirects)
+    resolved = defaultdict(set)
+    for url in urls:
+        title = path_to_title(url)
+        resolved[title].add(title)
+
+    params = {
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "prop": "links|info|categories",
+        "titles": "|".join(resolved),
+        "plnamespace": "0",
+        "pllimit": "max",
+        "cllimit": "max",
+        "clshow": "!hidden",
+        "redirects": "1",
+    }
+    found = set()
+    page_links = defaultdict(set)
+    page_titles = {}
+    page_categories = defaultdict(dict)
+
+    try:
+        cont = {}
+        while True:
+            resp = _session().get(api_url, params={**params, **cont}, timeout=10)
+            resp.raise_for_status()
+            data = resp.json()
+            if "error" in data:
+                raise ApiError(data["error"])
+
+            query = data.get("query", {})
+            for entry in query.get("normalized", []) + query.get("redirects", []):
+                resolved[entry["to"]] |= resolved.get(entry["from"], set())
+
+            for page in query.get("pages", []):
+                if page.get("missing") or page.get("invalid"):
+                    continue
+                requested = resolved.get(page["title"], set())
+                found |= requested
+                for title in requested:
+                    if title != page["title"]:
+                        aliases.record(title_to_path(title), title_to_path(page["title"]))
+                for title in requested:
+                    page_titles[title] = page["title"]
+                    for link in page.get("links", []):
+                        page_links[title].add(link["title"])
+                    for category in page.get("categories", []):
+                        page_categories[title][category["title"].split(":", 1)[-1]] = None
+
+            if "continue" not in data:
+                break
+            cont = data["continue"]
+    except Exception as e:
+        print_log(f"  ⚠️ Failed API batch of {len(urls)} pages ({urls[0]} ...): {e}", log_file)
+        status = _failure_status(e)
+        return [(url, [], None, status) for url in urls]
 
-def crawl_bfs_threaded(start_path, max_pages, log_file, topics, max_depth, enumeration=False, max_workers=MAX_WORKERS):
-    stats = CrawlStats(topics, max_depth)
-    queue = deque([(start_path, 0)])
+    results = []
+    for url in urls:
+        title = path_to_title(url)
+        if title not in found:
+            print_log(f"  🚫 No such page via API: {url}", log_file)
+            results.append((url, [], None, FETCH_MISSING))
+            continue
+
+        valid = [
+            (href, link_title)
+            for link_title in page_links[title]
+            for href in [title_to_path(link_title)]
+            if is_valid_wiki_link(href)
+        ]
+        filtered = [href for href, link_title in valid if matches_topic(href, link_title, topics)]
+        sampled = filtered if MAX_CHILDREN == -1 else random.sample(filtered, min(MAX_CHILDREN, len(filtered)))
+        features = PageFeatures(None, len(valid), page_titles.get(title), page_categories[title])
+        results.append((url, sampled, features, FETCH_OK))
+    return results
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def fetch_one(url, log_file, topics, backend=FETCH_BACKEND, api_url=API_URL):
+    if backend == "api":
+        return fetch_links_api([url], log_file, topics, api_url)[0]
+    return fetch_links(url, log_file, topics)
+
+def store_crawled(results, missing=()):
+    """Persist fetched (url, links, features) under their canonical URLs in one transaction.
+
+    missing: urls that do not exist, marked failed so they are never fetched again
+    """
+    aliases.flush()
+    rows, redirected = [], []
+    for url, links, features in results:
+        page = aliases.resolve(url)
+        if page != url:
+            redirected.append(url)
+        rows.append((page, links, features.word_count, features.out_links, features.title, features.categories))
+    db.store_pages(rows, redirected, missing)
+
+
+def crawl_bfs_threaded(start_path, max_pages, log_file, topics, max_depth, enumeration=False, max_workers=MAX_WORKERS,
+                       backend=FETCH_BACKEND, api_url=API_URL, frontier_items=FRONTIER_MEMORY_ITEMS,
+                       frontier_dir=None, control=None, stats=None, executor=None, tuner=None, frontier=None):
+    """BFS from start_path until max_pages are crawled or the frontier runs dry.
+
+    The serve daemon passes a long-lived executor, stats and frontier so worker
+    threads (and their keep-alive sessions), the counters and the BFS queue
+    survive across runs; start_path may then be None to continue the queue. It
+    also passes a CrawlControl whose pause/stop, worker count and topics are
+    applied at every batch boundary. With a ConcurrencyTuner the worker count is
+    re-chosen after every batch from its throughput, latency and errors.
+    Returns the number of pages crawled.
+    """
+    own_stats = stats is None
+    stats = stats or CrawlStats(topics, max_depth)
+    own_executor = executor is None
+    executor = executor or ThreadPoolExecutor(max_workers=tuner.max_workers if tuner else max_workers)
+    own_frontier = frontier is None
+    queue = frontier if frontier is not None else SpillingFrontier(max_items=frontier_items, spill_dir=frontier_dir)
+    if start_path:
+        queue.append((start_path, 0))
+        db.insert_page(start_path)
     retry_queue = deque()
-    db.insert_page(start_path, force=True)
 
     session_crawled = 0
 
     try:
         while queue and session_crawled < max_pages:
+            if control is not None:
+                if not control.checkpoint():
+                    break
+                max_workers, topics = control.workers, control.topics
+
+            # The API backend hands each worker a full title batch instead of one page
+            batch_limit = max_workers * API_BATCH_SIZE if backend == "api" else max_workers
+            batch_limit = min(batch_limit, max_pages - session_crawled)
             batch = []
-            while queue and len(batch) < MAX_WORKERS:
+            batched = set()
+            while queue and len(batch) < batch_limit:
                 url, depth = queue.popleft()
+                if url in batched:
+                    continue
                 if (max_depth < 0 or depth <= max_depth) and not db.is_crawled(url):
                     batch.append((url, depth))
+                    batched.add(url)
 
             stats.update(queued=len(queue) + len(batch))
 
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            started = time.perf_counter()
+            if backend == "api":
+                jobs = [batch[i:i + API_BATCH_SIZE] for i in range(0, len(batch), API_BATCH_SIZE)]
                 futures = {
-                    executor.submit(fetch_links, url, log_file, topics): (url, depth) for url, depth in batch
+                    executor.submit(_timed, fetch_links_api, [url for url, _ in job], log_file, topics, api_url): job
+                    for job in jobs
                 }
-                for future in as_completed(futures):
-                    url, links, word_count, success = future.result()
-                    original_url, depth = futures[future]
+            else:
+                futures = {
+                    executor.submit(_timed, fetch_links, url, log_file, topics): [(url, depth)] for url, depth in batch
+                }
+            crawled = []
+            missing = []
+            overloaded = 0
+            latencies = []
+            for future in as_completed(futures):
+                fetched, seconds = future.result()
+                latencies.append(seconds)
+                if backend != "api":
+                    fetched = [fetched]
 
-                    if success:
-                        db.insert_links(url, links)
-                        db.mark_crawled(url)
+                for (url, links, features, status), (original_url, depth) in zip(fetched, futures[future]):
+                    if status == FETCH_OK:
+                        crawled.append((url, links, features))
                         session_crawled += 1
                         stats.update(crawled=1, depth=depth)
 
@@ -104,23 +317,51 @@ def crawl_bfs_threaded(start_path, max_pages, log_file, topics, max_depth, enume
                                 print_log(f" └─ {child}", log_file)
 
                         for link in links:
-                            queue.append((link, depth + 1))
+                            queue.append((aliases.resolve(link), depth + 1))
+                    elif status == FETCH_MISSING:
+                        missing.append(url)
+                        stats.update(failed=1)
                     else:
+                        overloaded += status == FETCH_OVERLOADED
                         retry_queue.append((url, 0))
                         stats.update(failed=1)
 
+            # Links and metrics for the whole batch land in a single transaction
+            store_crawled(crawled, missing)
+
+            if tuner is not None:
+                tuned = tuner.observe(
+                    max_workers, len(futures), len(crawled), overloaded,
+                    latencies, time.perf_counter() - started
+                )
+                if tuned != max_workers:
+                    report = tuner.report()
+                    print_log(
+                        f"🎛️ Workers {max_workers} → {tuned} ({report['pages_per_sec']} pages/s, "
+                        f"{report['latency_ms']} ms/request, {report['error_rate']:.0%} errors)",
+                        log_file
+                    )
+                    max_workers = tuned
+                    if control is not None:
+                        control.set_workers(tuned)
+                stats.report(**tuner.report())
+            else:
+                stats.report(workers=max_workers)
+
             time.sleep(SLEEP_TIME)
 
         while retry_queue and session_crawled < max_pages:
+            if control is not None and not control.checkpoint():
+                break
             url, attempts = retry_queue.popleft()
             if attempts >= RETRY_ATTEMPTS:
                 print_log(f"❌ Giving up on {url} after {RETRY_ATTEMPTS} attempts.", log_file)
+                db.mark_failed(url)
                 continue
 
-            url, links, word_count, success = fetch_links(url, log_file, topics)
-            if success:
-                db.insert_links(url, links)
-                db.mark_crawled(url)
+            url, links, features, status = fetch_one(url, log_file, topics, backend, api_url)
+            if status == FETCH_OK:
+                store_crawled([(url, links, features)])
                 session_crawled += 1
                 stats.update(crawled=1, depth=1)
                 print_log(f"✅ RETRY Success {url} → {len(links)} links", log_file)
@@ -131,7 +372,10 @@ def crawl_bfs_threaded(start_path, max_pages, log_file, topics, max_depth, enume
                         print_log(f" └─ {child}", log_file)
 
                 for link in links:
-                    queue.append((link, 1))
+                    queue.append((aliases.resolve(link), 1))
+            elif status == FETCH_MISSING:
+                db.mark_failed(url)
+                stats.update(failed=1)
             else:
                 retry_queue.append((url, attempts + 1))
                 stats.update(failed=1, retries=1)
@@ -139,8 +383,15 @@ def crawl_bfs_threaded(start_path, max_pages, log_file, topics, max_depth, enume
             time.sleep(SLEEP_TIME)
 
     finally:
-        stats.stop()
-        print_log("✅ Crawl complete. Dashboard closed.", log_file)
+        if own_frontier:
+            queue.close()
+        if own_executor:
+            executor.shutdown()
+        if own_stats:
+            stats.stop()
+            print_log("✅ Crawl complete. Dashboard closed.", log_file)
+
+    return session_crawled
 
 def main_old():
     print("🚀 Wiki Crawler started!")
@@ -11,7 +11,7 @@ setup(
     entry_points={
         "console_scripts": [
             "export-wiki = py_crawler.export:cli",
-            "crawl-wiki = py_crawler.wiki_crawler:main"
+            "crawl-wiki = py_crawler.cli:main"
         ]
     },
     author="Your Name",
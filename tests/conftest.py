@@ -0,0 +1,21 @@
+# tests/conftest.py
+
+import pytest
+
+import py_crawler.db as db
+from py_crawler.canonical import aliases
+
+
+@pytest.fixture
+def wiki_db(tmp_path, monkeypatch):
+    """A fresh database in tmp_path, with the process-wide alias cache cleared."""
+    monkeypatch.setenv("WIKI_DB_PATH", str(tmp_path / "wiki_links.db"))
+    aliases.reset()
+    db.create_tables()
+    yield db.get_db_path()
+    aliases.reset()
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    return str(tmp_path / "crawler.log")
@@ -0,0 +1,9 @@
+DROP TABLE IF EXISTS `linktarget`;
+CREATE TABLE `linktarget` (
+  `lt_id` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+  `lt_namespace` int(11) NOT NULL,
+  `lt_title` varbinary(255) NOT NULL,
+  PRIMARY KEY (`lt_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=binary;
+
+INSERT INTO `linktarget` VALUES (10,0,'Beta'),(11,0,'O\'Brien_(surname)'),(12,0,'Gamma'),(13,10,'Infobox');
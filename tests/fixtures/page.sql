@@ -0,0 +1,21 @@
+-- MySQL dump 10.19  Distrib 10.3.38-MariaDB, for debian-linux-gnu (x86_64)
+--
+-- Host: db1206    Database: testwiki
+-- ------------------------------------------------------
+
+DROP TABLE IF EXISTS `page`;
+CREATE TABLE `page` (
+  `page_id` int(8) unsigned NOT NULL AUTO_INCREMENT,
+  `page_namespace` int(11) NOT NULL DEFAULT 0,
+  `page_title` varbinary(255) NOT NULL DEFAULT '',
+  `page_is_redirect` tinyint(1) unsigned NOT NULL DEFAULT 0,
+  `page_is_new` tinyint(1) unsigned NOT NULL DEFAULT 0,
+  `page_random` double unsigned NOT NULL DEFAULT 0,
+  `page_len` int(8) unsigned NOT NULL DEFAULT 0,
+  PRIMARY KEY (`page_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=binary;
+
+LOCK TABLES `page` WRITE;
+INSERT INTO `page` VALUES (1,0,'Alpha',0,0,0.123456789,1200),(2,0,'Beta',0,1,0.5,300),(3,0,'Old_alpha',1,0,0.75,20);
+INSERT INTO `page` VALUES (4,1,'Alpha',0,0,0.25,80),(5,0,'O\'Brien_(surname)',0,0,1.5e-3,640);
+UNLOCK TABLES;
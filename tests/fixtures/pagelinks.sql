@@ -0,0 +1,9 @@
+DROP TABLE IF EXISTS `pagelinks`;
+CREATE TABLE `pagelinks` (
+  `pl_from` int(8) unsigned NOT NULL DEFAULT 0,
+  `pl_from_namespace` int(11) NOT NULL DEFAULT 0,
+  `pl_target_id` bigint(20) unsigned NOT NULL,
+  PRIMARY KEY (`pl_from`,`pl_target_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=binary;
+
+INSERT INTO `pagelinks` VALUES (1,0,10),(1,0,11),(1,0,12),(1,0,13),(2,0,12),(4,1,10),(5,0,10);
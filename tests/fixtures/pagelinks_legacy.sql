@@ -0,0 +1,11 @@
+DROP TABLE IF EXISTS `pagelinks`;
+CREATE TABLE `pagelinks` (
+  `pl_from` int(8) unsigned NOT NULL DEFAULT 0,
+  `pl_namespace` int(11) NOT NULL DEFAULT 0,
+  `pl_title` varbinary(255) NOT NULL DEFAULT '',
+  `pl_from_namespace` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`pl_from`,`pl_namespace`,`pl_title`)
+) ENGINE=InnoDB DEFAULT CHARSET=binary;
+
+INSERT INTO `pagelinks` VALUES (1,0,'Beta',0),(1,0,'O\'Brien_(surname)',0),(1,0,'Gamma',0),(1,10,'Infobox',0);
+INSERT INTO `pagelinks` VALUES (2,0,'Gamma',0),(4,0,'Beta',1),(5,0,'Beta',0);
@@ -0,0 +1,164 @@
+# tests/test_api_backend.py
+#
+# fetch_links_api against a stub api.php served from a local thread.
+
+import json
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import py_crawler.db as db
+from py_crawler.canonical import aliases
+from py_crawler.wiki_crawler import (
+    FETCH_FAILED, FETCH_MISSING, FETCH_OK, FETCH_OVERLOADED, crawl_bfs_threaded, fetch_links_api
+)
+
+
+class StubApi(BaseHTTPRequestHandler):
+    """Answers from a list of canned replies, keyed by the continue token sent."""
+
+    replies = {}
+    requests = []
+
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        type(self).requests.append(params)
+        reply = self.replies(params) if callable(self.replies) else self.replies[params.get("plcontinue")]
+        body = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api(wiki_db):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubApi)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    StubApi.requests = []
+    yield StubApi, f"http://127.0.0.1:{server.server_address[1]}/w/api.php"
+    server.shutdown()
+    server.server_close()
+
+
+# Two pages, one requested through a redirect; Foo's links span two responses
+CONTINUED = {
+    None: {
+        "continue": {"plcontinue": "1|0|Gamma", "continue": "||"},
+        "query": {
+            "normalized": [{"from": "foo", "to": "Foo"}],
+            "redirects": [{"from": "Old name", "to": "Bar"}],
+            "pages": [
+                {"pageid": 1, "ns": 0, "title": "Foo",
+                 "links": [{"ns": 0, "title": "Alpha"}, {"ns": 0, "title": "Beta"}],
+                 "categories": [{"ns": 14, "title": "Category:Letters"}]},
+                {"pageid": 2, "ns": 0, "title": "Bar", "links": [{"ns": 0, "title": "Delta"}]},
+            ],
+        },
+    },
+    "1|0|Gamma": {
+        "batchcomplete": True,
+        "query": {
+            "normalized": [{"from": "foo", "to": "Foo"}],
+            "redirects": [{"from": "Old name", "to": "Bar"}],
+            "pages": [
+                {"pageid": 1, "ns": 0, "title": "Foo",
+                 "links": [{"ns": 0, "title": "Gamma"}, {"ns": 0, "title": "Help:Contents"}]},
+                {"pageid": 2, "ns": 0, "title": "Bar"},
+            ],
+        },
+    },
+}
+
+
+def test_follows_continuation(api, log_file):
+    stub, url = api
+    stub.replies = CONTINUED
+    results = fetch_links_api(["/wiki/foo", "/wiki/Old_name"], log_file, [], url)
+
+    assert [r[0] for r in results] == ["/wiki/foo", "/wiki/Old_name"]
+    (_, foo_links, foo_features, foo_status), (_, bar_links, _, bar_status) = results
+    assert foo_status == bar_status == FETCH_OK
+    # Links from both responses, with the namespaced one dropped
+    assert sorted(foo_links) == ["/wiki/Alpha", "/wiki/Beta", "/wiki/Gamma"]
+    assert foo_features.out_links == 3
+    assert foo_features.title == "Foo"
+    assert list(foo_features.categories) == ["Letters"]
+    assert bar_links == ["/wiki/Delta"]
+
+    assert len(stub.requests) == 2
+    assert stub.requests[0]["titles"] == "foo|Old name"
+    assert stub.requests[1]["plcontinue"] == "1|0|Gamma"
+
+
+def test_records_redirects_as_aliases(api, log_file):
+    stub, url = api
+    stub.replies = CONTINUED
+    fetch_links_api(["/wiki/Old_name"], log_file, [], url)
+
+    assert aliases.resolve("/wiki/Old_name") == "/wiki/Bar"
+    assert ("/wiki/Old_name", "/wiki/Bar") in aliases.flush()
+
+
+def test_topic_filter(api, log_file):
+    stub, url = api
+    stub.replies = CONTINUED
+    (_, links, features, status), = fetch_links_api(["/wiki/foo"], log_file, ["gam"], url)
+
+    assert status == FETCH_OK
+    assert links == ["/wiki/Gamma"]
+    # out_links counts every article link, not just the topic matches
+    assert features.out_links == 3
+
+
+def test_missing_page_is_final(api, log_file):
+    stub, url = api
+    stub.replies = {None: {"query": {"pages": [
+        {"ns": 0, "title": "Nowhere", "missing": True},
+        {"pageid": 3, "ns": 0, "title": "Here", "links": [{"ns": 0, "title": "There"}]},
+    ]}}}
+    results = fetch_links_api(["/wiki/Nowhere", "/wiki/Here"], log_file, [], url)
+
+    # Red links are missing, not failed: the crawl marks them done instead of retrying
+    assert results[0] == ("/wiki/Nowhere", [], None, FETCH_MISSING)
+    assert results[1][1] == ["/wiki/There"]
+    assert results[1][3] == FETCH_OK
+
+
+@pytest.mark.parametrize("code, status", [("ratelimited", FETCH_OVERLOADED), ("badvalue", FETCH_FAILED)])
+def test_api_error_fails_whole_batch(api, log_file, code, status):
+    stub, url = api
+    stub.replies = {None: {"error": {"code": code, "info": "Nope"}}}
+    results = fetch_links_api(["/wiki/A", "/wiki/B"], log_file, [], url)
+
+    assert results == [("/wiki/A", [], None, status), ("/wiki/B", [], None, status)]
+
+
+def test_crawl_marks_red_links_failed_once(api, log_file, wiki_db):
+    stub, url = api
+    wiki = {"Start": ["Live", "Red link"], "Live": []}
+
+    def reply(params):
+        pages = [
+            {"ns": 0, "title": title, "links": [{"ns": 0, "title": t} for t in wiki[title]]}
+            if title in wiki else {"ns": 0, "title": title, "missing": True}
+            for title in params["titles"].split("|")
+        ]
+        return {"batchcomplete": True, "query": {"pages": pages}}
+
+    stub.replies = staticmethod(reply)
+    crawled = crawl_bfs_threaded("/wiki/Start", 10, log_file, [], -1, backend="api", api_url=url)
+
+    assert crawled == 2
+    with sqlite3.connect(wiki_db) as conn:
+        rows = dict(conn.execute("SELECT url, crawled FROM pages"))
+    assert rows == {"/wiki/Start": 1, "/wiki/Live": 1, "/wiki/Red_link": -1}
+    assert sum("Red link" in r["titles"] for r in stub.requests) == 1
+    assert db.get_next_uncrawled() is None
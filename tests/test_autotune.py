@@ -0,0 +1,66 @@
+# tests/test_autotune.py
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from py_crawler.autotune import ConcurrencyTuner
+from py_crawler.wiki_crawler import FETCH_FAILED, FETCH_MISSING, FETCH_OVERLOADED, fetch_links
+
+
+class StatusPages(BaseHTTPRequestHandler):
+    # /wiki/<status> answers with that HTTP status
+    def do_GET(self):
+        self.send_response(int(self.path.rsplit("/", 1)[1]))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StatusPages)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize("code, status", [
+    (404, FETCH_MISSING),
+    (410, FETCH_MISSING),
+    (403, FETCH_FAILED),
+    (429, FETCH_OVERLOADED),
+    (503, FETCH_OVERLOADED),
+])
+def test_fetch_failure_status(server, log_file, code, status):
+    assert fetch_links(f"{server}/wiki/{code}", log_file, [])[3] == status
+
+
+def test_connection_refused_is_overload(log_file):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StatusPages)
+    port = httpd.server_address[1]
+    httpd.server_close()
+
+    assert fetch_links(f"http://127.0.0.1:{port}/wiki/200", log_file, [])[3] == FETCH_OVERLOADED
+
+
+def test_tuner_grows_when_nothing_is_overloaded():
+    tuner = ConcurrencyTuner(4, min_workers=1, max_workers=32)
+    workers = 4
+    for _ in range(10):
+        workers = tuner.observe(workers, workers, workers, 0, [0.1] * workers, 0.1)
+
+    assert workers > 4
+    assert tuner.error_rate == 0
+
+
+def test_tuner_backs_off_on_overload():
+    tuner = ConcurrencyTuner(16, min_workers=1, max_workers=32)
+    workers = tuner.observe(16, 16, 8, 8, [0.1] * 16, 0.1)
+
+    assert workers < 16
+    assert tuner.error_rate == 0.5
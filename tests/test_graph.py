@@ -0,0 +1,63 @@
+# tests/test_graph.py
+
+import io
+import json
+import sqlite3
+
+import pytest
+
+from py_crawler.canonical import title_to_path
+from py_crawler.graph import find_neighborhood, find_path
+
+CAFE = title_to_path("Café")  # stored percent-encoded: /wiki/Caf%C3%A9
+CRAWLER = "/wiki/Web_crawler"
+SEARCH = "/wiki/Search_engine"
+
+
+@pytest.fixture
+def graph_db(wiki_db):
+    with sqlite3.connect(wiki_db) as conn:
+        conn.executemany("INSERT INTO links (from_url, to_url) VALUES (?, ?)", [
+            (CAFE, CRAWLER),
+            (CRAWLER, SEARCH),
+        ])
+    return wiki_db
+
+
+def query(fn, *args):
+    out = io.StringIO()
+    fn(*args, out=out)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize("source", [
+    "Café",
+    "/wiki/Café",
+    CAFE,
+    "https://en.wikipedia.org/wiki/Café",
+    "https://en.wikipedia.org" + CAFE,
+])
+def test_path_resolves_non_ascii_titles(graph_db, source):
+    result, = query(find_path, source, "Search engine")
+
+    assert result["path"] == [CAFE, CRAWLER, SEARCH]
+
+
+@pytest.mark.parametrize("target", ["web_crawler", "web crawler", "/wiki/web_crawler"])
+def test_path_resolves_lowercase_titles(graph_db, target):
+    result, = query(find_path, "Café", target)
+
+    assert result["hops"] == 1
+    assert result["to"] == CRAWLER
+
+
+def test_neighborhood_resolves_like_path(graph_db):
+    rows = query(find_neighborhood, "web_crawler")
+
+    assert rows == [{"url": CRAWLER, "hops": 0}, {"url": SEARCH, "hops": 1}]
+
+
+def test_unknown_page(graph_db):
+    result, = query(find_path, "Nowhere", "Café")
+
+    assert result["error"] == "unknown page: Nowhere"
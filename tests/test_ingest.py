@@ -0,0 +1,125 @@
+# tests/test_ingest.py
+#
+# Dump parsers and bulk ingest against the tiny dumps in tests/fixtures.
+
+import gzip
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from py_crawler.canonical import title_to_path
+from py_crawler.ingest import ingest_sql_dumps, ingest_xml_dump, iter_sql_rows, iter_xml_pages
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+ALPHA, BETA, GAMMA = "/wiki/Alpha", "/wiki/Beta", "/wiki/Gamma"
+OBRIEN = title_to_path("O'Brien (surname)")
+
+
+def fixture(name):
+    return os.path.join(FIXTURES, name)
+
+
+def read_graph(db_path):
+    with sqlite3.connect(db_path) as conn:
+        links = set(conn.execute("SELECT from_url, to_url FROM links"))
+        pages = {url: (crawled, out_links) for url, crawled, out_links in
+                 conn.execute("SELECT url, crawled, out_links FROM pages")}
+    return links, pages
+
+
+# ── Parsers ──────────────────────────────────────────────────────
+def test_sql_rows_keyed_by_create_table_columns():
+    rows = list(iter_sql_rows(fixture("page.sql")))
+
+    assert [row["page_id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0] == {
+        "page_id": 1, "page_namespace": 0, "page_title": "Alpha", "page_is_redirect": 0,
+        "page_is_new": 0, "page_random": 0.123456789, "page_len": 1200,
+    }
+    # Escaped quotes and parentheses inside strings do not split the row
+    assert rows[4]["page_title"] == "O'Brien_(surname)"
+    assert rows[4]["page_random"] == 1.5e-3
+
+
+def test_sql_rows_from_gzip(tmp_path):
+    path = tmp_path / "page.sql.gz"
+    with open(fixture("page.sql"), "rb") as src, gzip.open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+
+    assert list(iter_sql_rows(str(path))) == list(iter_sql_rows(fixture("page.sql")))
+
+
+def test_xml_pages_skip_redirects_and_other_namespaces():
+    pages = {title: sorted(links) for title, links in iter_xml_pages(fixture("pages-articles.xml"))}
+
+    assert pages == {
+        # Section links collapse to the article; files and categories are kept here, dropped on ingest
+        "Alpha": ["Beta", "Category:Letters", "File:Alpha.png", "Gamma"],
+        "Beta": ["Alpha", "O'Brien (surname)"],
+    }
+
+
+# ── Ingest ───────────────────────────────────────────────────────
+def test_ingest_sql_with_linktarget(wiki_db, log_file):
+    pages, links = ingest_sql_dumps(
+        fixture("page.sql"), fixture("pagelinks.sql"), fixture("linktarget.sql"), log_file=log_file
+    )
+    graph, rows = read_graph(wiki_db)
+
+    assert (pages, links) == (3, 5)
+    assert graph == {(ALPHA, BETA), (ALPHA, OBRIEN), (ALPHA, GAMMA), (BETA, GAMMA), (OBRIEN, BETA)}
+    assert rows == {ALPHA: (1, 3), BETA: (1, 1), OBRIEN: (1, 1), GAMMA: (0, None)}
+
+
+def test_ingest_legacy_pagelinks_matches_linktarget(wiki_db, log_file, tmp_path, monkeypatch):
+    ingest_sql_dumps(fixture("page.sql"), fixture("pagelinks.sql"), fixture("linktarget.sql"), log_file=log_file)
+    expected = read_graph(wiki_db)
+
+    monkeypatch.setenv("WIKI_DB_PATH", str(tmp_path / "legacy.db"))
+    ingest_sql_dumps(fixture("page.sql"), fixture("pagelinks_legacy.sql"), log_file=log_file)
+
+    assert read_graph(str(tmp_path / "legacy.db")) == expected
+
+
+def test_ingest_xml(wiki_db, log_file):
+    pages, links = ingest_xml_dump(fixture("pages-articles.xml"), log_file=log_file)
+    graph, rows = read_graph(wiki_db)
+
+    assert (pages, links) == (2, 4)
+    assert graph == {(ALPHA, BETA), (ALPHA, GAMMA), (BETA, ALPHA), (BETA, OBRIEN)}
+    assert rows == {ALPHA: (1, 2), BETA: (1, 2), GAMMA: (0, None), OBRIEN: (0, None)}
+
+
+def test_ingest_keeps_crawled_pages(wiki_db, log_file):
+    with sqlite3.connect(wiki_db) as conn:
+        conn.execute("INSERT INTO pages (url, crawled) VALUES (?, 1)", (GAMMA,))
+    ingest_xml_dump(fixture("pages-articles.xml"), log_file=log_file)
+
+    assert read_graph(wiki_db)[1][GAMMA][0] == 1
+
+
+def test_ingest_new_pagelinks_requires_linktarget(wiki_db, log_file):
+    with pytest.raises(SystemExit):
+        ingest_sql_dumps(fixture("page.sql"), fixture("pagelinks.sql"), log_file=log_file)
+
+    assert read_graph(wiki_db) == (set(), {})
+
+
+def test_ingest_unresolved_targets_leave_page_uncrawled(wiki_db, log_file, tmp_path):
+    # linktarget without Gamma (id 12), which Alpha and Beta link to
+    partial = tmp_path / "linktarget.sql"
+    with open(fixture("linktarget.sql"), encoding="utf-8") as f:
+        partial.write_text(f.read().replace("(12,0,'Gamma'),", ""), encoding="utf-8")
+
+    pages, links = ingest_sql_dumps(
+        fixture("page.sql"), fixture("pagelinks.sql"), str(partial), log_file=log_file
+    )
+    graph, rows = read_graph(wiki_db)
+
+    assert (pages, links) == (1, 3)
+    assert graph == {(ALPHA, BETA), (ALPHA, OBRIEN), (OBRIEN, BETA)}
+    # The namespace-10 target (id 13) is resolved, just not an article
+    assert rows == {ALPHA: (0, None), BETA: (0, None), OBRIEN: (1, 1)}
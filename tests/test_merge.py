@@ -0,0 +1,40 @@
+# tests/test_merge.py
+#
+# Merging other crawler databases into the current one.
+
+import sqlite3
+
+from py_crawler.merge import merge_databases
+
+
+def make_source(path, rows, with_metrics=True):
+    with sqlite3.connect(path) as conn:
+        if with_metrics:
+            conn.execute("CREATE TABLE pages (url TEXT PRIMARY KEY, crawled INTEGER, word_count INTEGER, "
+                         "out_links INTEGER)")
+            conn.executemany("INSERT INTO pages VALUES (?, ?, ?, ?)", rows)
+        else:
+            # Predates the metric and title columns
+            conn.execute("CREATE TABLE pages (url TEXT PRIMARY KEY, crawled INTEGER)")
+            conn.executemany("INSERT INTO pages VALUES (?, ?)", [row[:2] for row in rows])
+    return str(path)
+
+
+def page_metrics(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {url: (crawled, wc, ol) for url, crawled, wc, ol in
+                conn.execute("SELECT url, crawled, word_count, out_links FROM pages")}
+
+
+def test_merge_takes_metrics_as_a_pair_from_the_later_source(wiki_db, tmp_path, log_file):
+    first = make_source(tmp_path / "a.db", [("/wiki/A", 1, 900, 10), ("/wiki/B", 1, 50, 3)])
+    # A was recrawled after an edit: fewer words, more links
+    second = make_source(tmp_path / "b.db", [("/wiki/A", 1, 400, 25), ("/wiki/B", 0, None, None)])
+    old = make_source(tmp_path / "old.db", [("/wiki/A", 1, None, None)], with_metrics=False)
+
+    merge_databases([first, second, old], log_file=log_file)
+
+    assert page_metrics(wiki_db) == {
+        "/wiki/A": (1, 400, 25),
+        "/wiki/B": (1, 50, 3),
+    }